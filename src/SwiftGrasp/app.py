@@ -7,10 +7,11 @@ from dateutil.relativedelta import relativedelta
 
 # import pandas as pd
 
-# import numpy as np
+import numpy as np
 import os
 import pickle
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import warnings
 
@@ -19,10 +20,12 @@ warnings.filterwarnings("ignore")
 sys.path.insert(0, "../src/SwiftGrasp")
 from utils import (  # noqa: E402
     CheckTicker,
-    FinancialStatementData,
     StockData,  # fmt: off
+    format_date,
+    parse_date,
 )
 from plot_helper import line_plots, line_bar  # noqa: E402
+from cach_data import dedup_stock, get_financial, store  # noqa: E402
 
 cach_folder = "./cached"
 # date colname is hard coded here, should think about
@@ -52,8 +55,6 @@ st.markdown(
 )
 st.text("\n")
 
-fm = None
-
 ticker_selectbox = st.selectbox(
     label="Option 1: Choose a ticker \
             from the dropdown list",
@@ -87,8 +88,28 @@ if ticker_text == "":
 else:
     ticker = ticker_text
 
-# check validaty of the ticker
-ct = CheckTicker(ticker, type="both")
+
+# check validaty of the ticker, the probes hit yahoo so the
+# CheckTicker is shared in the process for the day instead of
+# re-running on every rerun; one whose check failed isn't kept, so
+# the ticker is checked again on the next rerun
+def check_ticker(ticker: str):
+    return CheckTicker.validate_many([ticker], type="both")[ticker.upper()]
+
+
+@st.experimental_singleton(show_spinner=False)
+def load_fuzzy_match():
+    with open(os.path.join("./src/SwiftGrasp/resources", "fuzzy_match.p"), "rb") as f:
+        return pickle.load(f)
+
+
+# the same text comes back on every rerun of the page
+@st.experimental_memo(max_entries=256, ttl=3600, show_spinner=False)
+def fuzzy_match(text: str):
+    return load_fuzzy_match().match(text)
+
+
+ct = check_ticker(ticker.upper())
 
 ticker = ct.ticker
 
@@ -98,20 +119,10 @@ if not (ct.has_stock or ct.has_statement):
         Are you trying to find the tickers from below:_"
     )
 
-    if fm is None:
-        fm = pickle.load(
-            open(  # fmt: off
-                os.path.join(  # fmt: off
-                    "./src/SwiftGrasp/resources",  # fmt: off
-                    "fuzzy_match.p",  # fmt: off
-                ),
-                "rb",
-            )
-        )
-
-    st.write(fm.match(ticker))
+    st.write(fuzzy_match(ticker))
 
 else:
+    # the shared CheckTicker keeps the date once it's pulled
     first_trade_date = ct.get_first_trade_date()
 
     if ct.has_stock:
@@ -133,12 +144,92 @@ else:
 st.subheader("2. Financial statement data")
 
 
-# load data
-@st.cache(allow_output_mutation=True)
-def load_data(filename: str):
-    with open(os.path.join(cach_folder, f"{filename}.p"), "rb") as pf:
-        obj = pickle.load(pf)
-    return obj
+@st.experimental_singleton
+def get_executor():
+    return ThreadPoolExecutor(max_workers=4)
+
+
+def get_stock_all(ticker, start_date, end_date, frequency):
+    # the ticker was validated already, don't probe it again
+    sd = StockData(
+        ticker,
+        start_date=start_date,
+        end_date=end_date,
+        frequency=frequency,
+        check_ticker=ct,
+    )
+    return sd.get_stock()
+
+
+# the stock data of section 3 doesn't depend on this section, so
+# it's pulled in the background meanwhile with the defaults of the
+# widgets. The future is kept in the session with its params, so a
+# rerun only pulls again once section 3 asks for other params. No
+# streamlit calls are made from the worker thread
+if ct.has_stock and ct.has_statement:
+    stock_params, _ = st.session_state.get("stock_future", (None, None))
+    if stock_params is None or stock_params[0] != ticker:
+        today = datetime.datetime.today().date()
+        # fmt: off
+        stock_params = (
+            ticker,
+            format_date(max(today - relativedelta(years=3),
+                            parse_date(first_trade_date))),
+            format_date(today),
+            "daily",
+        )
+        # fmt: on
+        st.session_state["stock_future"] = (
+            stock_params,
+            get_executor().submit(get_stock_all, *stock_params),
+        )
+
+
+# load data, the summary is memoized so the file is only unpickled
+# once. It's keyed on the file's mtime, so a summary saved again is
+# loaded again; the future of a load started earlier in the session
+# is waited on instead of loading the file a second time
+@st.experimental_memo(max_entries=32, ttl=3600, show_spinner=False)
+def load_sc_summary(filename: str, mtime: float, _future: Future = None):
+    if _future is None:
+        _future = store.get(filename)
+    return _future.result()
+
+
+# start loading the summary in the background, once per session and
+# file version; the future stays in the session, it's not shared
+def prefetch_sc_summary(filename: str):
+    key = (filename, store.mtime(filename))
+    if st.session_state.get("sc_summary", (None, None))[0] != key:
+        st.session_state["sc_summary"] = (key, store.get(filename))
+
+
+def get_sc_summary(filename: str):
+    key = (filename, store.mtime(filename))
+    prefetched, future = st.session_state.get("sc_summary", (None, None))
+    try:
+        return load_sc_summary(*key, _future=future if prefetched == key else None)
+    except Exception:
+        # a failed load isn't memoized, drop its future as well so the
+        # next rerun reads the file again
+        st.session_state.pop("sc_summary", None)
+        return None
+
+
+@st.experimental_memo(max_entries=32, ttl=3600, show_spinner=False)
+def load_financial(ticker: str, frequency: str, _check_ticker=None):
+    return get_financial(ticker, frequency, check_ticker=_check_ticker)
+
+
+# split the columns by their magnitude so that the small ones
+# (e.g. ratios) are plotted on the secondary axis; it's a max over
+# a few columns, cheap enough to run on every rerun
+def split_by_magnitude(df, options: list):
+    maxes = df[options].max()
+    return (
+        maxes.index[maxes > 1e6].tolist(),
+        maxes.index[maxes <= 1e6].tolist(),
+    )
 
 
 if ct.has_statement:
@@ -150,21 +241,19 @@ if ct.has_statement:
     fd_frequency_dict = {"quarterly": "Q", "annual": "Y"}
     fd_frequency_abbr = fd_frequency_dict.get(fd_frequency)
 
-    # ToDo: need to check irregular ticker name for file name
-    fname = f"fsd_{ticker}_{fd_frequency_abbr}"
-    if os.path.exists(os.path.join(cach_folder, f"{fname}.p")):
-        fsd = load_data(fname)
-    else:
-        fsd = FinancialStatementData(ticker, frequency=fd_frequency)
-        with open(os.path.join(cach_folder, f"{fname}.p"), "wb") as pf:
-            pickle.dump(fsd, pf, protocol=4)
+    # start loading the structural change summary of section 4 in
+    # the background while the data below is being pulled
+    fname = f"struc_change_{ticker}_{fd_frequency_abbr}_summary"
+    if ct.has_stock and store.exists(fname):
+        prefetch_sc_summary(fname)
 
-    df_financial = fsd.get_all_data()
+    # ToDo: need to check irregular ticker name for file name
+    df_financial = load_financial(ticker, fd_frequency_abbr, ct)
 
     # fmt: off
-    change_dt_list = (
-        df_financial[date_col].dt.strftime("%Y-%m-%d").to_list()
-    )
+    change_dt_list = np.datetime_as_string(
+        df_financial[date_col].to_numpy("datetime64[D]"), unit="D"
+    ).tolist()
     # fmt: on
 
     st.write(df_financial)
@@ -179,8 +268,7 @@ if ct.has_statement:
     )
     # fmt: on
 
-    op10 = [col for col in options0 if max(df_financial[col]) > 1e6]
-    op20 = [col for col in options0 if max(df_financial[col]) <= 1e6]
+    op10, op20 = split_by_magnitude(df_financial, options0)
 
     # fmt: off
     st.bokeh_chart(
@@ -200,9 +288,7 @@ st.subheader("3. Stock data")
 
 if ct.has_stock:
     today = datetime.datetime.today().date()
-    first_trade_date_format = datetime.datetime.strptime(
-        first_trade_date, "%Y-%m-%d"
-    ).date()
+    first_trade_date_format = parse_date(first_trade_date)
 
     # fmt: off
     start_time, end_time = st.slider(
@@ -228,13 +314,26 @@ if ct.has_stock:
 
     resample_dict = {"daily": "D", "weekly": "W", "monthly": "MS"}
 
-    sd = StockData(
+    params = (
         ticker,
-        start_date=start_time.strftime("%Y-%m-%d"),
-        end_date=end_time.strftime("%Y-%m-%d"),
-        frequency=stock_frequency,
+        format_date(start_time),
+        format_date(end_time),
+        stock_frequency,
     )
-    df_stock_all = sd.get_stock()
+    df_stock_all = None
+    stock_params, stock_future = st.session_state.get("stock_future", (None, None))
+    if params == stock_params:
+        try:
+            df_stock_all = stock_future.result()
+        except Exception:
+            # a failed background pull is done again below, where its
+            # error is raised as on any direct pull
+            pass
+    if df_stock_all is None:
+        df_stock_all = get_stock_all(*params)
+        stock_future = Future()
+        stock_future.set_result(df_stock_all)
+        st.session_state["stock_future"] = (params, stock_future)
 
     # make some plots
     options_stock = st.multiselect(
@@ -261,16 +360,11 @@ if ct.has_stock:
 
     df_stock = df_stock_all.loc[:, [date_col, "close"]]
 
-    df_stock_fill = (
-        df_stock.drop_duplicates(subset=date_col, keep="last")
-        .set_index(date_col)
-        .sort_index()
-    )
+    df_stock_fill = dedup_stock(df_stock, date_col)
+    # edge fill for the days yahoo returns without a close price
     # fmt: off
     df_stock_fill = df_stock_fill.resample(
-        resample_dict.get(stock_frequency)).fillna(
-        "nearest"
-    )
+        resample_dict.get(stock_frequency)).nearest().ffill().bfill()
     # fmt: on
 else:
     st.markdown(
@@ -283,16 +377,16 @@ st.subheader("4. Structural change - causal inference")
 
 if ct.has_stock and ct.has_statement:
     fname = f"struc_change_{ticker}_{fd_frequency_abbr}_summary"
-    if os.path.exists(os.path.join(cach_folder, f"{fname}.p")):
-        sc_summary = load_data(fname)
-
+    sc_summary = get_sc_summary(fname) if store.exists(fname) else None
+    if sc_summary is not None:
         st.write("Structural change summary")
         st.write(sc_summary)
 
+        # only the analyzed dates have plots
         struc_chg_selectbox = st.selectbox(
             label="Select a possible change \
                 date to view the plots",
-            options=change_dt_list,
+            options=sc_summary.index.tolist(),
         )
 
         # need to break this to two lines
@@ -301,13 +395,8 @@ if ct.has_stock and ct.has_statement:
             + f"_{struc_chg_selectbox}.png"
         # fmt: on
 
-        from PIL import Image
-
-        image = Image.open(os.path.join(cach_folder, fname))
-
-        st.image(image)
-        # fig = load_data(fname)
-        # st.pyplot(fig)
+        with open(os.path.join(cach_folder, fname), "rb") as f:
+            st.image(f.read())
     else:
         st.markdown(
             "_The ticker you chose hasn't been processed \
@@ -1,77 +1,361 @@
+import io
+import multiprocessing
 import os
 import pickle
-from utils import FinancialStatementData, StockData, StructuralChange
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import product
+import numpy as np
+import pandas as pd
+from utils import (
+    CheckTicker,
+    FinancialStatementData,
+    StockData,
+    StructuralChange,
+)
 
 cach_folder = "./cached"
+date_col = "formatted_date"
 
 frequency_dict = {
     "Q": "quarterly",
     "Y": "annual",
 }
 
+# shared by all the stores, loading cached objects is I/O and
+# deserialization bound so a couple of threads are enough
+_executor = ThreadPoolExecutor(max_workers=2)
+
+
+class LazyPickleStore:
+    """
+    A disk store for the pickled objects in the cache folder.
+
+    Existence checks only touch the file system, and the objects
+    are unpickled in a background thread so that the caller can
+    keep going (e.g. render the rest of the page) and only wait on
+    the result right before it's needed.
+
+    Parameters
+    ----------
+    folder : str
+        The folder where the pickle files are saved.
+    ttl : float, optional
+        How long, in seconds, the listing of the folder is reused
+        for the existence checks before it's refreshed.
+        By default 2.0.
+
+    Examples
+    --------
+    Start loading a cached object and get it later:
+
+    >>> store = LazyPickleStore("./cached")
+    >>> future = store.get("struc_change_AAPL_Q_summary")
+    >>> df_summary = future.result()
+
+    Save an object to the store:
+
+    >>> store.put("struc_change_AAPL_Q_summary", df_summary)
+
+    Plain dataframes can be saved as parquet files instead, which
+    are smaller and faster to load than pickles:
+
+    >>> store.put_frame("fsd_AAPL_Q", df_financial)
+    >>> df_financial = store.get_frame("fsd_AAPL_Q").result()
+    """
+
+    def __init__(self, folder: str, ttl: float = 2.0) -> None:
+        self.folder = folder
+        self.ttl = ttl
+
+        self._prefix = folder + os.sep
+        self._listing = frozenset()
+        self._listing_stamp = None
+
+    def _path(self, key: str, ext: str = ".p"):
+        return self._prefix + key + ext
+
+    def _list_folder(self):
+        """
+        Get the file names in the folder, the listing is only
+        refreshed once it's older than the ttl.
+        """
+        now = time.monotonic()
+        if self._listing_stamp is None or now - self._listing_stamp > self.ttl:
+            try:
+                self._listing = frozenset(os.listdir(self.folder))
+            except FileNotFoundError:
+                self._listing = frozenset()
+            self._listing_stamp = now
+        return self._listing
+
+    def exists(self, key: str, ext: str = ".p"):
+        """
+        Check whether the object is saved in the store.
+
+        Parameters
+        ----------
+        key : str
+            The name of the object, without the file extension.
+        ext : str, optional
+            The file extension, ".p" for pickles and ".parquet" for
+            dataframes. By default ".p".
+
+        Returns
+        -------
+        bool
+            True if the file exists.
+        """
+        return key + ext in self._list_folder()
+
+    def mtime(self, key: str, ext: str = ".p"):
+        """
+        Get the modification time of the saved object, so a cached
+        copy can tell when the file was saved again.
+
+        Parameters
+        ----------
+        key : str
+            The name of the object, without the file extension.
+        ext : str, optional
+            The file extension, ".p" for pickles and ".parquet" for
+            dataframes. By default ".p".
+
+        Returns
+        -------
+        Union[float, None]
+            The modification time, or None if there's no such file.
+        """
+        try:
+            return os.path.getmtime(self._path(key, ext))
+        except OSError:
+            return None
+
+    def get(self, key: str) -> Future:
+        """
+        Load the object in the background.
+
+        Parameters
+        ----------
+        key : str
+            The name of the object, without the file extension.
+
+        Returns
+        -------
+        Future
+            A future whose result is the unpickled object.
+        """
+        return _executor.submit(_load_pickle, self._path(key))
+
+    def put(self, key: str, obj):
+        """
+        Save the object to the store.
+
+        The object is written to a temporary file first and then
+        moved to its final name, so that a concurrent reader never
+        sees a partially written file.
+
+        Parameters
+        ----------
+        key : str
+            The name of the object, without the file extension.
+        obj : Any
+            The object to be pickled.
+        """
+        _write_atomic(
+            self._path(key), pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+        self._listing = self._listing | {f"{key}.p"}
+
+    def get_frame(self, key: str) -> Future:
+        """
+        Load the dataframe from its parquet file in the background.
+
+        Parameters
+        ----------
+        key : str
+            The name of the dataframe, without the file extension.
+
+        Returns
+        -------
+        Future
+            A future whose result is the loaded dataframe.
+        """
+        return _executor.submit(pd.read_parquet, self._path(key, ".parquet"))
+
+    def put_frame(self, key: str, df: pd.DataFrame):
+        """
+        Save the dataframe to the store as a parquet file.
+
+        Parameters
+        ----------
+        key : str
+            The name of the dataframe, without the file extension.
+        df : pd.DataFrame
+            The dataframe to be saved.
+        """
+        path = self._path(key, ".parquet")
+        tmp = _tmp_path(path)
+        df.to_parquet(tmp, compression="zstd")
+        os.replace(tmp, path)
+        self._listing = self._listing | {f"{key}.parquet"}
+
+
+def _tmp_path(path: str):
+    # unique per process and thread, the app writes from the script
+    # threads of several sessions at once
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+
+
+def _write_atomic(path: str, data: bytes):
+    # write to a temporary file next to the target and swap it in,
+    # so readers and concurrent writers never see a partial file
+    tmp = _tmp_path(path)
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _load_pickle(path: str):
+    with open(path, "rb") as pf:
+        return pickle.load(pf)
+
+
+store = LazyPickleStore(cach_folder)
+
 
 def load_data(filename: str):
-    with open(os.path.join(cach_folder, f"{filename}.p"), "rb") as pf:
-        obj = pickle.load(pf)
-    return obj
+    return store.get(filename).result()
 
 
-def get_fsd(
+def get_financial(
     ticker,
     frequency: str = "Q",
     delete_if_exists: bool = False,
+    check_ticker: CheckTicker = None,
 ):
+    # only the merged dataframe is used downstream, so that's what
+    # gets cached instead of the whole FinancialStatementData object
     fname = f"fsd_{ticker}_{frequency}"
 
-    if os.path.exists(os.path.join(cach_folder, f"{fname}.p")) and not delete_if_exists:
-        fsd = load_data(fname)
+    if store.exists(fname, ".parquet") and not delete_if_exists:
+        df_financial = store.get_frame(fname).result()
     else:
-        fsd = FinancialStatementData(  # fmt: off
-            ticker, frequency_dict.get(frequency)  # fmt: off
-        )
-        with open(os.path.join(cach_folder, f"{fname}.p"), "wb") as pf:
-            pickle.dump(fsd, pf, protocol=4)
+        if store.exists(fname) and not delete_if_exists:
+            # pickles cached before the switch to parquet
+            fsd = load_data(fname)
+        else:
+            fsd = FinancialStatementData(  # fmt: off
+                ticker,
+                frequency_dict.get(frequency),
+                check_ticker=check_ticker,
+            )
+        df_financial = fsd.get_all_data()
+        store.put_frame(fname, df_financial)
 
-    return fsd
+    return df_financial
 
 
-def get_stock(ticker, fsd):
-    df_financial = fsd.get_all_data()
+def dedup_stock(df_stock, date_col: str):
+    """
+    Keep the last row of each date and index the stock data by date.
 
-    sd = StockData(ticker)
+    The stock data usually comes in chronological order already, in
+    which case the last row of each run of equal dates is found with
+    one comparison of neighbours instead of hashing and sorting.
+
+    Parameters
+    ----------
+    df_stock : pd.DataFrame
+        A pandas dataframe that has the stock time series.
+    date_col : str
+        The colname of the dates.
+
+    Returns
+    -------
+    pd.DataFrame
+        The de-duplicated dataframe sorted by its datetime index.
+    """
+    dates = df_stock[date_col]
+    if dates.is_monotonic_increasing:
+        values = dates.to_numpy()
+        mask = np.empty(len(values), dtype=bool)
+        mask[:-1] = values[:-1] != values[1:]
+        mask[-1:] = True
+        return df_stock[mask].set_index(date_col)
+    else:
+        return df_stock[~dates.duplicated(keep="last")].set_index(date_col).sort_index()
+
+
+def get_stock(ticker, df_financial, check_ticker: CheckTicker = None):
+    sd = StockData(ticker, check_ticker=check_ticker)
     df_stock = sd.get_stock()
 
-    df_stock = df_stock.loc[:, [fsd._colname_date, "close"]]
+    df_stock = df_stock.loc[:, [date_col, "close"]]
 
-    df_stock_fill = (
-        df_stock.drop_duplicates(subset=fsd._colname_date, keep="last")
-        .set_index(fsd._colname_date)
-        .sort_index()
-    )
-    df_stock_fill = df_stock_fill.resample("D").fillna("nearest")
+    df_stock_fill = dedup_stock(df_stock, date_col)
+    # edge fill for the days yahoo returns without a close price
+    df_stock_fill = df_stock_fill.resample("D").nearest().ffill().bfill()
 
-    change_dt_list = (
-        df_financial[fsd._colname_date]  # fmt: off
-        .dt.strftime("%Y-%m-%d")
-        .to_list()  # fmt: off
-    )  # fmt: off
+    change_dt_list = np.datetime_as_string(
+        df_financial[date_col].to_numpy("datetime64[D]"), unit="D"
+    ).tolist()
 
     return df_stock_fill, change_dt_list
 
 
+def trim_change_dates(df_stock_fill, change_dt_list, window: str = "90D"):
+    """
+    Keep the unique change dates that have enough stock data before
+    and after them to fit the structural change model.
+
+    Parameters
+    ----------
+    df_stock_fill : pd.DataFrame
+        The resampled stock data, indexed by date.
+    change_dt_list : List[str]
+        The possible change dates, in YYYY-MM-DD format.
+    window : str, optional
+        The minimum length of the stock data needed on both sides
+        of a change date. By default "90D".
+
+    Returns
+    -------
+    List[str]
+        The change dates that can be analyzed.
+    """
+    change_dt_list = list(dict.fromkeys(change_dt_list))
+    if len(df_stock_fill) == 0 or len(change_dt_list) == 0:
+        return []
+
+    window = pd.Timedelta(window)
+    dates = pd.to_datetime(change_dt_list)
+    mask = (dates >= df_stock_fill.index[0] + window) & (
+        dates <= df_stock_fill.index[-1] - window
+    )
+    return [dt for dt, keep in zip(change_dt_list, mask) if keep]
+
+
 def cach_struc_chg(
     ticker,  # fmt: off
     df_stock_fill,  # fmt: off
     change_dt_list,  # fmt: off
     frequency: str = "Q",  # fmt: off
 ):
+    import matplotlib.pyplot as plt
+
+    # every date is a model fit, skip the ones that can't be fitted
+    change_dt_list = trim_change_dates(df_stock_fill, change_dt_list)
+    if len(change_dt_list) == 0:
+        print(f"no change dates to analyze: {ticker}, {frequency}")
+        return
+
     sc = StructuralChange(df_stock_fill, change_dt_list)
     sc.analyze()
 
     # save summary
-    fname = f"struc_change_{ticker}_{frequency}_summary"
-    with open(os.path.join(cach_folder, f"{fname}.p"), "wb") as pf:
-        pickle.dump(sc._df_summary, pf, protocol=4)
+    store.put(f"struc_change_{ticker}_{frequency}_summary", sc._df_summary)
 
     # save plots
     for td in sc._ci_dict.keys():
@@ -79,23 +363,48 @@ def cach_struc_chg(
 
         ci_select.plot(show=False)
 
+        # save the rendered png rather than pickling the figure, and
+        # close it so pyplot doesn't keep every figure alive
+        fig = plt.gcf()
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=110, bbox_inches="tight")
+        plt.close("all")
+
         fname = os.path.join(
             cach_folder, f"fig_struc_change_{ticker}_{frequency}_{td}.png"
         )
+        _write_atomic(fname, buf.getvalue())
+
 
-        os.rename("temp.png", fname)
+def cach_one(ticker, frequency: str = "Q"):
+    print(f"processing: {ticker}, {frequency}")
+    # validate once for both the statement and the stock data
+    ct = CheckTicker(ticker, type="both").check()
+    df_financial = get_financial(ticker, frequency, check_ticker=ct)
+    df_stock_fill, change_dt_list = get_stock(ticker, df_financial, ct)
+    cach_struc_chg(ticker, df_stock_fill, change_dt_list, frequency)
 
 
 if __name__ == "__main__":
-    for ticker in (
+    tickers = (
         "AAPL",
         "AMZN",
         "GOOGL",
         "MSFT",
         "BILI",
-    ):
-        for frequency in ("Y", "Q"):
-            print(f"processing: {ticker}, {frequency}")
-            fsd = get_fsd(ticker, frequency)
-            df_stock_fill, change_dt_list = get_stock(ticker, fsd)
-            cach_struc_chg(ticker, df_stock_fill, change_dt_list, frequency)
+    )
+    jobs = list(product(tickers, ("Y", "Q")))
+    # every (ticker, frequency) is independent, so fit them in
+    # parallel; tensorflow runs its own threads in every worker, so
+    # only use half the cores to not oversubscribe them. spawn so
+    # that the workers don't inherit tensorflow state from a fork
+    max_workers = min(len(jobs), max(1, (os.cpu_count() or 1) // 2))
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        futures = [
+            executor.submit(cach_one, ticker, frequency) for ticker, frequency in jobs
+        ]
+        for future in futures:
+            future.result()
@@ -1,9 +1,4 @@
-# import numpy as np
-# import pandas as pd
-
-# import matplotlib as mpl
-# import matplotlib.pyplot as plt
-# import seaborn as sns
+import numpy as np
 
 # from bokeh.io import show,  output_file
 from bokeh.models import (
@@ -21,11 +16,21 @@ from bokeh.models import (
     Span,
 )
 from bokeh.plotting import figure
-from bokeh.palettes import Category10
+from bokeh.palettes import Category10_10
+
+from math import floor
 
 from time import mktime
 from datetime import datetime as dt
 
+_palette = list(Category10_10)
+
+
+def _colors(n: int):
+    # Category10[n] is the first n colors of the 10 color palette,
+    # cycle through it when there're more than 10 series
+    return [_palette[i % len(_palette)] for i in range(n)]
+
 
 def line_plots(
     df,
@@ -38,12 +43,22 @@ def line_plots(
     xlabel="Time",
     width=600,
     height=500,
+    source: ColumnDataSource = None,
 ):
-    source = ColumnDataSource(data=df)
+    # only ship the plotted columns, as numpy arrays, to the browser
+    cols = [col_x] + list(cols_y) + list(cols_y2 or [])
+    if source is None:
+        data = {col: df[col].to_numpy() for col in cols}
+        # datetime64[ms] is serialized as a typed array, not a list
+        data[col_x] = df[col_x].to_numpy("datetime64[ms]")
+        source = ColumnDataSource(data=data)
+    else:
+        # a source shared with other figures is only shipped once
+        data = {col: np.asarray(source.data[col]) for col in cols}
     # fmt: off
     p = figure(
         title=title,
-        tools="hover",
+        tools="",
         x_axis_type="datetime",
         width=width,
         height=height
@@ -55,11 +70,10 @@ def line_plots(
         color_length += len(cols_y2)
     # cl=inferno(color_length)
     # change the colorpalatte
-    if color_length < 3:
-        cl = Category10[3][:color_length]
-    else:
-        cl = Category10[color_length]
-    i = 0
+    cl = _colors(color_length)
+    fmt_date = " @" + col_x + "{%F}"
+    formatters = {"@" + col_x: "datetime"}
+    renderers = []
     for name, color in zip(cols_y, cl[: len(cols_y)]):
         pt = p.line(
             col_x,
@@ -72,25 +86,17 @@ def line_plots(
             muted_alpha=0.2,
             legend_label=name,
         )
-        if i == 0:
-            hover = p.select(dict(type=HoverTool))
-            hover.tooltips = [
-                ("Quarter", " @" + col_x + "{%F}"),
-                (name, " @{" + name + "}{0,f}"),
-            ]
-            hover.formatters = {"@" + col_x: "datetime"}
-        else:
-            p.add_tools(
-                HoverTool(
-                    renderers=[pt],
-                    tooltips=[
-                        ("Quarter", " @" + col_x + "{%F}"),
-                        (name, " @{" + name + "}{0,f}"),
-                    ],
-                    formatters={"@" + col_x: "datetime"},
-                )
+        renderers.append(pt)
+    # one hover tool for all the lines rather than one per line
+    if renderers:
+        p.add_tools(
+            HoverTool(
+                renderers=renderers,
+                tooltips=[("Quarter", fmt_date)]
+                + [(name, " @{" + name + "}{0,f}") for name in cols_y],
+                formatters=formatters,
             )
-        i = i + 1
+        )
 
     if xRange:
         p.x_range = xRange
@@ -107,15 +113,16 @@ def line_plots(
     if cols_y2:
         # Setting the second y axis range name and range
         y2_start = 0
-        if all(max(df[col]) <= 1 for col in cols_y2):
+        # one min and one max reduction over all the columns
+        arr2 = np.column_stack([data[col] for col in cols_y2]).astype(float)
+        mx = np.nanmax(arr2, axis=0)
+        if (mx <= 1).all():
             y2_end = 1
-            mm = min(min(df[col]) for col in cols_y2)
+            mm = np.nanmin(arr2)
             if mm < 0:
-                from math import floor
-
                 y2_start = floor(mm * 10) / 10.0
         else:
-            y2_end = max(max(df[col]) for col in cols_y2)
+            y2_end = float(np.nanmax(mx))
         # fmt: off
         p.extra_y_ranges = {
             "Percentage": Range1d(start=y2_start, end=y2_end)
@@ -123,7 +130,18 @@ def line_plots(
         # fmt: on
         # Adding the second axis to the plot.
         p.add_layout(LinearAxis(y_range_name="Percentage"), "right")
+        data2 = {col: data[col] for col in [col_x] + list(cols_y2)}
+        # the missing values are dropped so the lines don't break,
+        # the series missing the same rows share one source
+        sources2 = {}
+        renderers2 = []
         for name, color in zip(cols_y2, cl[len(cols_y) :]):
+            mask = np.isfinite(data[name].astype(float))
+            key = mask.tobytes()
+            if key not in sources2:
+                sources2[key] = ColumnDataSource(
+                    data={col: values[mask] for col, values in data2.items()}
+                )
             pt2 = p.line(
                 col_x,
                 name,
@@ -131,26 +149,25 @@ def line_plots(
                 color=color,
                 alpha=0.8,
                 muted_color=color,
-                source=df[~df[name].isnull()],
+                source=sources2[key],
                 muted_alpha=0.2,
                 legend_label=name,
                 y_range_name="Percentage",
                 line_dash="4 4",
             )
-            if y2_end == 1:
-                fmt = "{0.0%}"
-            else:
-                fmt = "{0,f}"
-            p.add_tools(
-                HoverTool(
-                    renderers=[pt2],
-                    tooltips=[
-                        ("Quarter", " @" + col_x + "{%F}"),
-                        (name, " @{" + name + "}" + fmt),
-                    ],
-                    formatters={"@" + col_x: "datetime"},
-                )
+            renderers2.append(pt2)
+        if y2_end == 1:
+            fmt = "{0.0%}"
+        else:
+            fmt = "{0,f}"
+        p.add_tools(
+            HoverTool(
+                renderers=renderers2,
+                tooltips=[("Quarter", fmt_date)]
+                + [(name, " @{" + name + "}" + fmt) for name in cols_y2],
+                formatters=formatters,
             )
+        )
         if y2_end == 1:
             p.yaxis[1].formatter = NumeralTickFormatter(format="0%")
 
@@ -174,12 +191,14 @@ def line_bar(
     width=600,
     height=500,
     vline_list: list = None,
+    source: ColumnDataSource = None,
 ):
-    source = ColumnDataSource(data=df)
+    if source is None:
+        source = ColumnDataSource(data=df)
     # fmt: off
     p = figure(
         title=title,
-        tools="hover",
+        tools="",
         x_axis_type="datetime",
         width=width,
         height=height
@@ -188,11 +207,10 @@ def line_bar(
 
     color_length = len(cols_y) + 1
 
-    if color_length < 3:
-        cl = Category10[3][:color_length]
-    else:
-        cl = Category10[color_length]
-    i = 0
+    cl = _colors(color_length)
+    fmt_date = " @" + col_x + "{%F}"
+    formatters = {"@" + col_x: "datetime"}
+    renderers = []
     for name, color in zip(cols_y, cl[: len(cols_y)]):
         pt = p.line(
             col_x,
@@ -205,25 +223,17 @@ def line_bar(
             muted_alpha=0.2,
             legend_label=name,
         )
-        if i == 0:
-            hover = p.select(dict(type=HoverTool))
-            hover.tooltips = [
-                ("Date", " @" + col_x + "{%F}"),
-                (name, " @{" + name + "}{0,f}"),
-            ]
-            hover.formatters = {"@" + col_x: "datetime"}
-        else:
-            p.add_tools(
-                HoverTool(
-                    renderers=[pt],
-                    tooltips=[
-                        ("Date", " @" + col_x + "{%F}"),
-                        (name, " @{" + name + "}{0,f}"),
-                    ],
-                    formatters={"@" + col_x: "datetime"},
-                )
+        renderers.append(pt)
+    # one hover tool for all the lines rather than one per line
+    if renderers:
+        p.add_tools(
+            HoverTool(
+                renderers=renderers,
+                tooltips=[("Date", fmt_date)]
+                + [(name, " @{" + name + "}{0,f}") for name in cols_y],
+                formatters=formatters,
             )
-        i = i + 1
+        )
 
     if xRange:
         p.x_range = xRange
@@ -231,7 +241,8 @@ def line_bar(
         p.y_range = yRange
     else:
         p.y_range.start = 0
-        p.y_range.end = max(max(df[col]) for col in cols_y) * 1.05
+        arr = df[cols_y].to_numpy(dtype=float)
+        p.y_range.end = float(np.nanmax(arr)) * 1.05
 
     p.xaxis.axis_label = xlabel
     p.grid.grid_line_color = "gray"
@@ -239,7 +250,7 @@ def line_bar(
     if col_y2:
         # Setting the second y axis range name and range
         y2_start = 0
-        y2_end = max(df[col_y2])
+        y2_end = float(np.nanmax(df[col_y2].to_numpy(dtype=float)))
         p.extra_y_ranges = {"Bar": Range1d(start=y2_start, end=y2_end)}
         # Adding the second axis to the plot.
         p.add_layout(LinearAxis(y_range_name="Bar"), "right")
@@ -264,10 +275,10 @@ def line_bar(
             HoverTool(
                 renderers=[pt2],
                 tooltips=[
-                    ("Date", " @" + col_x + "{%F}"),
+                    ("Date", fmt_date),
                     (col_y2, " @{" + col_y2 + "}" + fmt),
                 ],
-                formatters={"@" + col_x: "datetime"},
+                formatters=formatters,
             )
         )
 
@@ -8,8 +8,12 @@ folder_resource = "./src/SwiftGrasp/resources/"
 
 def load_nasdaq():
     filename = "nasdaq-listed.csv"
-    df1 = pd.read_csv(os.path.join(folder_resource, filename))
-    df1 = df1.loc[:, ["Symbol", "Company Name", "Security Name"]]
+    # only parse the needed columns, as plain strings
+    df1 = pd.read_csv(
+        os.path.join(folder_resource, filename),
+        usecols=["Symbol", "Company Name", "Security Name"],
+        dtype=str,
+    )
     df1["Exchange"] = "NASDAQ"
 
     return df1
@@ -19,8 +23,11 @@ def load_other():
     # nyse listing are totally contained by other-listed so no need
     # to load
     filename = "other-listed.csv"
-    df3 = pd.read_csv(os.path.join(folder_resource, filename))
-    df3 = df3.loc[:, ["CQS Symbol", "Company Name", "Security Name"]]
+    df3 = pd.read_csv(
+        os.path.join(folder_resource, filename),
+        usecols=["CQS Symbol", "Company Name", "Security Name"],
+        dtype=str,
+    )
     df3.rename(columns={"CQS Symbol": "Symbol"}, inplace=True)
     df3["Exchange"] = "other"
 
@@ -30,23 +37,19 @@ def load_other():
 def process_df(df1: pd.DataFrame, df2: pd.DataFrame):
     df = pd.concat([df1, df2], ignore_index=True)
 
-    gb = df.groupby("Company Name")["Symbol"].count()
-    gb = gb.reset_index()
-    list_dup_name = gb.loc[gb["Symbol"] > 3, "Company Name"].to_list()
+    counts = df.groupby("Company Name", sort=False).size()
+    list_dup_name = counts.index[counts > 3].to_list()
 
-    df["company name length"] = df["Company Name"].str.len()
-    list_abbr_name = df.loc[
-        df["company name length"] < 5, "Company Name"
-    ].to_list()  # fmt: off
+    short_mask = df["Company Name"].str.len() < 5
+    list_abbr_name = df.loc[short_mask, "Company Name"].to_list()
 
     full_set = set(list_abbr_name + list_dup_name)
 
-    df.loc[df["Company Name"].isin(full_set), "Company Name"] = df.loc[
-        df["Company Name"].isin(full_set), "Security Name"
-    ]
+    mask = df["Company Name"].isin(full_set)
+    df.loc[mask, "Company Name"] = df.loc[mask, "Security Name"]
     df.rename(columns={"Symbol": "Ticker"}, inplace=True)
 
-    return df.drop(["Security Name", "company name length"], axis=1)
+    return df.drop(["Security Name"], axis=1)
 
 
 if __name__ == "__main__":
@@ -63,5 +66,5 @@ if __name__ == "__main__":
     pickle.dump(
         fm,
         open(os.path.join(folder_resource, "fuzzy_match.p"), "wb"),
-        protocol=4,  # fmt: off
+        protocol=pickle.HIGHEST_PROTOCOL,  # fmt: off
     )
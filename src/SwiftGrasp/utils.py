@@ -1,4 +1,16 @@
 import datetime
+import hashlib
+import inspect
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cached_property, lru_cache, partial, wraps
+from itertools import repeat
 from typing import Union, List
 import pandas as pd
 import numpy as np
@@ -6,8 +18,13 @@ from yahoofinancials import YahooFinancials
 from dateutil.relativedelta import relativedelta
 import warnings
 
-from causalimpact import CausalImpact
-from thefuzz import process
+from thefuzz import fuzz, process
+from thefuzz import utils as fuzz_utils
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 class CheckTicker:
@@ -34,6 +51,17 @@ class CheckTicker:
         If "both", it will check whether it has financial
         statement data and also check for stock data.
         By default "statement".
+    skip_stock_probe : bool, optional
+        If True, the stock price data isn't probed when it's
+        validated. It's meant for callers that pull the stock
+        data right after and pass it to _set_stock_prices.
+        By default False.
+    frequency : str, optional
+        The frequency of the income statement that is probed for
+        the statement check, either 'quarterly' or 'annual'. Pass
+        the frequency that will be pulled afterwards, so the probe
+        is reused as the pull.
+        By default 'quarterly'.
 
     Examples
     --------
@@ -49,6 +77,10 @@ class CheckTicker:
     but that's not necessarily mean that the ticker
     does not have stock data. It's just unchecked.
 
+    The data is only checked when has_statement or has_stock
+    is first read, so creating the object doesn't hit the
+    sources.
+
     Check whether the ticker is valid and has the
     financial statement data and/or the stock data.
 
@@ -59,59 +91,204 @@ class CheckTicker:
     >>> ct.has_stock
     True
 
+    Run both checks at once:
+    >>> ct = CheckTicker(ticker, type = 'both').check()
+
     You can also get the first trade date of the
     ticker:
     >>> ct.get_first_trade_date()
     '1927-12-30'
     """
 
-    def __init__(self, ticker: str, type: str = "statement") -> None:
+    __check_types__ = frozenset({"statement", "stock", "both"})
+
+    def __init__(
+        self,
+        ticker: str,
+        type: str = "statement",
+        skip_stock_probe: bool = False,
+        frequency: str = "quarterly",
+    ) -> None:
         self.ticker = _validate_type_str(ticker).upper()
         self._yf = None
+        self._frequency = frequency
 
         self.first_trade_date = None
 
-        self.has_statement: bool = False
-        self.has_stock: bool = False
-
         self._today_prices = None
-        self._validate(type)
+        self._validate(type, skip_stock_probe)
+
+    @cached_property
+    def has_statement(self) -> bool:
+        """
+        Whether the ticker has financial statement data, it's only
+        checked when it's first read.
+        """
+        return self._validate_statement()
+
+    @cached_property
+    def has_stock(self) -> bool:
+        """
+        Whether the ticker has stock price data, it's only checked
+        when it's first read.
+        """
+        self._validate_stock()
+        return self._check_stock_prices()
+
+    def check(self):
+        """
+        Run the checks of the ticker that haven't been run yet.
+
+        When both the statement data and the stock data are
+        unchecked, the two probes are sent at the same time.
+
+        Returns
+        -------
+        CheckTicker
+            The object itself, with the checks done.
+        """
+        names = [
+            name for name in ("has_statement", "has_stock") if name not in vars(self)
+        ]
+        if len(names) > 1:
+            with ThreadPoolExecutor(max_workers=len(names)) as executor:
+                futures = [executor.submit(getattr, self, name) for name in names]
+            for future in futures:
+                future.result()
+        else:
+            for name in names:
+                getattr(self, name)
+
+        return self
+
+    @classmethod
+    def validate_many(cls, tickers: List[str], type: str = "statement") -> dict:
+        """
+        Check several tickers at once, with the probes of all the
+        tickers sent at the same time.
+
+        The CheckTickers are the shared ones of _get_check_ticker,
+        so the probes go through the caches and a ticker that was
+        checked already isn't checked again. The returned objects
+        are shared and shouldn't be modified.
+
+        Parameters
+        ----------
+        tickers : List[str]
+            The tickers to be validated on.
+        type : str, optional
+            It can only be "statement", "stock" or "both", see
+            CheckTicker. By default "statement".
+
+        Returns
+        -------
+        dict
+            The checked CheckTicker of every ticker, keyed by the
+            upper case ticker.
+
+        Raises
+        ------
+        ValueError
+            If the parameter 'type' is not one of the value of
+            'statement','stock','both'.
+
+        Examples
+        --------
+        >>> cts = CheckTicker.validate_many(['AAPL', '^GSPC'], 'both')
+        >>> cts['^GSPC'].has_statement
+        False
+        """
+        if type not in cls.__check_types__:
+            raise ValueError(
+                "Parameter type can only be \
+                'statement', 'stock' or 'both'."
+            )
+        names = {
+            "statement": ("has_statement",),
+            "stock": ("has_stock",),
+            "both": ("has_statement", "has_stock"),
+        }[type]
+
+        cts = {}
+        for ticker in tickers:
+            ticker = _validate_type_str(ticker).upper()
+            if ticker not in cts:
+                cts[ticker] = _get_check_ticker(ticker)
+        if not cts:
+            return cts
+
+        with ThreadPoolExecutor(max_workers=min(8, len(cts) * len(names))) as executor:
+            futures = [
+                executor.submit(getattr, ct, name)
+                for ct in cts.values()
+                for name in names
+            ]
+        for future in futures:
+            future.result()
+
+        return cts
 
     def _validate_statement(self):
         """
         Check whether the ticker has financial statement data.
+
+        Returns
+        -------
+        bool
+            True if the ticker has financial statement data.
         """
-        _tst = self._yf.get_financial_stmts(
-            frequency="Quarterly", statement_type="income"
-        )
-        if list(_tst.values())[0][self.ticker] is not None:
-            self.has_statement = True
+        _tst = _get_financial_stmts(self.ticker, self._frequency, "income")
+        # a failed pull can come back without the header or the ticker
+        stmts = next(iter(_tst.values()), None) if _tst else None
+        return isinstance(stmts, dict) and stmts.get(self.ticker) is not None
 
     def _validate_stock(self):
         """
-        Check whether the ticker has stock price data.
+        Pull the recent stock prices to check whether the ticker has
+        stock price data.
         """
-        today = datetime.datetime.today()
-        days_ago = today - relativedelta(days=8)
-        self._today_prices = self._yf.get_historical_price_data(
-            days_ago.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"), "weekly"
-        )
+        today = datetime.date.today().isoformat()
+        self._today_prices = _probe_stock_prices(self.ticker, today)
 
+    def _check_stock_prices(self):
+        """
+        Check whether the pulled historical price json object has
+        any stock price data.
+
+        Returns
+        -------
+        bool
+            True if the ticker has stock price data.
+        """
         # ?? In what circumstances will eventsData is the only key
         # and there're some data in eventsData? because if no
         # circumstances like that, won't need the latter condition
-        if (
-            len(self._today_prices[self.ticker].keys()) > 1
-            or len(self._today_prices[self.ticker]["eventsData"]) > 0
-        ):
-            self.has_stock = True
+        payload = (self._today_prices or {}).get(self.ticker)
+        if not isinstance(payload, dict):
+            return False
+        return len(payload.keys()) > 1 or len(payload.get("eventsData") or {}) > 0
+
+    def _set_stock_prices(self, prices: dict):
+        """
+        Check whether the ticker has stock price data, given by the
+        historical price json object of any time window.
+
+        Parameters
+        ----------
+        prices : dict
+            The json object returned by get_historical_price_data.
+        """
+        self._today_prices = prices
+        self.has_stock = self._check_stock_prices()
 
-    def _validate(self, type: str):
+    def _validate(self, type: str, skip_stock_probe: bool = False):
         """
         Main function to check whether the ticker input
-        is correct data type, and if so, whether it's
-        valid and has financial statement data and/or
-        stock price data.
+        is correct data type, and set up which types of
+        data will be checked.
+
+        The data itself is only checked when has_statement or
+        has_stock is read, the types not asked for stay False.
 
         Parameters
         ----------
@@ -126,6 +303,9 @@ class CheckTicker:
             If "both", it will check whether it has financial
             statement data and also check for stock data.
             By default "statement".
+        skip_stock_probe : bool, optional
+            If True, the stock price data isn't probed.
+            By default False.
 
         Raises
         ------
@@ -133,17 +313,19 @@ class CheckTicker:
             If the parameter 'type' is not one of the value of
             'statement','stock','both'.
         """
-        self._yf = YahooFinancials(self.ticker)
-
-        if type == "statement" or type == "both":
-            self._validate_statement()
-        if type == "stock" or type == "both":
-            self._validate_stock()
-        if type not in ("statement", "stock", "both"):
+        if type not in self.__check_types__:
             raise ValueError(
                 "Parameter type can only be \
                 'statement', 'stock' or 'both'."
             )
+
+        if self._yf is None:
+            self._yf = CachedYF(self.ticker)
+
+        if type == "stock":
+            self.has_statement = False
+        if type == "statement" or skip_stock_probe:
+            self.has_stock = False
         # ToDo [future]: check whether ticker already in the databse
 
     def _pull_first_trade_date(self):
@@ -152,7 +334,8 @@ class CheckTicker:
         prices data.
         """
         if self._today_prices is None:
-            self._validate(type="stock")
+            self._validate_stock()
+            self.has_stock = self._check_stock_prices()
         if self.has_stock is True:
             self.first_trade_date = self._today_prices[self.ticker]["firstTradeDate"][
                 "formatted_date"
@@ -191,6 +374,10 @@ class FinancialStatementData:
         The frequency of the financial statement data, it can only
         be either 'quarterly' or 'annual' or None.
         By default None. If None, it will be 'quarterly'.
+    check_ticker : Union[CheckTicker, None], optional
+        An already validated CheckTicker of the same ticker. If it
+        has statement data, it's reused instead of validating the
+        ticker again. By default None.
 
     Examples
     --------
@@ -223,8 +410,19 @@ class FinancialStatementData:
         "cash": "cashflowStatement",
     }
 
-    def __init__(self, ticker: str, frequency: Union[str, None] = None) -> None:
-        ct = CheckTicker(ticker, type="statement")
+    def __init__(
+        self,
+        ticker: str,
+        frequency: Union[str, None] = None,
+        check_ticker: Union[CheckTicker, None] = None,
+    ) -> None:
+        # fail fast on a bad frequency before hitting the source
+        self.frequency = self._validate_input_frequency(frequency)
+
+        if _reuse_check_ticker(check_ticker, ticker, "statement"):
+            ct = check_ticker
+        else:
+            ct = _get_check_ticker(_validate_type_str(ticker).upper(), self.frequency)
         if ct.has_statement:
             self.ticker = ct.ticker
         else:
@@ -233,41 +431,87 @@ class FinancialStatementData:
                 financial statement data in sources."
             )
 
-        self.frequency = self._validate_input_frequency(frequency)
         self._balance = None
         self._income = None
         self._cash = None
         self._df_merge = None
         self._colname_date = "formatted_date"
 
+        # the json header names only depend on the frequency
+        suf = self._get_table_suffix()
+        self._header_map = {
+            abbr: prefix + "History" + suf
+            for abbr, prefix in self.__table_prefix_dict__.items()
+        }
+
         self._yf = ct._yf
 
-        self._pull_data()
-        self._merge_data()
+    def _pull_statement(self, abbr: str):
+        """
+        Pull and format one of the financial statements.
+
+        Parameters
+        ----------
+        abbr : str
+            The abbreviation of what type of the financial statement
+            data it it, it can only be one of the keys of
+            self.__table_prefix_dict__
+
+        Returns
+        -------
+        pd.DataFrame
+            A pandas dataframe that has the corresponding financial
+            statement data.
+        """
+        jsn = _get_financial_stmts(self.ticker, self.frequency, abbr)
+        return self._format_financial_data(jsn, abbr)
 
     def _pull_data(self):
         """
         A wrapper function to pull the balance sheet, the income
-        statement, and the cash flow statement data.
+        statement, and the cash flow statement data that haven't
+        been pulled yet.
         """
-        self._balance = self._format_financial_data("balance")
-        self._income = self._format_financial_data("income")
-        self._cash = self._format_financial_data("cash")
+        # the statements are separate requests (yahoofinancials walks
+        # a list of statement types one by one), send them at once
+        missing = [
+            abbr
+            for abbr in self.__table_prefix_dict__
+            if getattr(self, f"_{abbr}") is None
+        ]
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                abbr: executor.submit(self._pull_statement, abbr) for abbr in missing
+            }
+        for abbr, future in futures.items():
+            setattr(self, f"_{abbr}", future.result())
 
     def _merge_data(self):
         """
         Process the duplicated columns from the financial dataframes
         and merge them into one dataframe.
-        """
-        self._income = self._drop_dup(self._balance, self._income)
-        self._cash = self._drop_dup(self._balance, self._cash)
-        self._cash = self._drop_dup(self._income, self._cash)
 
-        self._df_merge = self._balance.merge(
-            self._income, on=self._colname_date, how="outer"
-        )
-        self._df_merge = self._df_merge.merge(
-            self._cash, on=self._colname_date, how="outer"
+        The single statements are kept as they are, the duplicated
+        columns are only dropped for the merge.
+        """
+        income = self._drop_dup(self._balance, self._income)
+        cash = self._drop_dup(self._balance, self._cash)
+        cash = self._drop_dup(income, cash)
+
+        # the dates are unique per statement, so the outer join is an
+        # alignment on the date index, done for all three at once
+        frames = [
+            df.drop_duplicates(self._colname_date, keep="last").set_index(
+                self._colname_date
+            )
+            for df in (self._balance, income, cash)
+        ]
+        # keep yahoo's newest-first order, like the outer merges did and
+        # the frames cached before did
+        self._df_merge = (
+            pd.concat(frames, axis=1, join="outer")
+            .sort_index(ascending=False)
+            .reset_index()
         )
 
     def _drop_dup(self, df1: pd.DataFrame, df2: pd.DataFrame):
@@ -292,10 +536,11 @@ class FinancialStatementData:
             The second dataframe that dropped the duplicated columns,
             if there're any.
         """
-        dup_list = list(set(df1.columns) & set(df2.columns))
+        cols = df2.columns.intersection(df1.columns, sort=False).drop(
+            self._colname_date, errors="ignore"
+        )
 
-        if len(dup_list) > 1:
-            cols = [i for i in dup_list if i != self._colname_date]
+        if len(cols) > 0:
             return df2.drop(cols, axis=1)
         else:
             return df2
@@ -339,18 +584,18 @@ class FinancialStatementData:
         str
             The full json header name
         """
-        if abbr in self.__table_prefix_dict__.keys():
-            suf = self._get_table_suffix()
-            return self.__table_prefix_dict__.get(abbr) + "History" + suf
+        return self._header_map.get(abbr)
 
-    def _format_financial_data(self, abbr: str):
+    def _format_financial_data(self, jsn: dict, abbr: str):
         """
-        Pull the financial statement data from YahooFinancials
-        and format the raw json data format to be the desired
-        pandas dataframe output.
+        Format the raw json data pulled from YahooFinancials
+        to be the desired pandas dataframe output.
 
         Parameters
         ----------
+        jsn : dict
+            The raw json object of the financial statement data,
+            it has to contain the statement of the abbreviation.
         abbr : str
             The abbreviation of what type of the financial statement
             data it it, it can only be one of the keys of
@@ -362,21 +607,42 @@ class FinancialStatementData:
             A pandas dataframe that has the corresponding financial
             statement data.
         """
-        jsn = self._yf.get_financial_stmts(
-            frequency=self.frequency, statement_type=abbr
-        )
-
-        result_list = []
         header = self._get_json_header_name(abbr)
         obj = jsn[header][self.ticker]
-        for i in range(len(obj)):
-            df_temp = pd.DataFrame(obj[i].values(), index=obj[i].keys()).reset_index()
 
-            df_temp.rename(columns={"index": self._colname_date}, inplace=True)
-            df_temp[self._colname_date] = pd.to_datetime(df_temp[self._colname_date])
-            result_list.append(df_temp)
+        # each period is a {date: {item: value}} dict, flatten them
+        # so the dataframe is built once rather than once per period
+        dates = []
+        rows = []
+        for period in obj:
+            for dt, items in period.items():
+                dates.append(dt)
+                rows.append(items)
+
+        # the line items keep the order they first appear in, and
+        # the values are filled into one float block; a period that
+        # misses an item leaves a NaN
+        col_idx = {}
+        for items in rows:
+            for k in items:
+                if k not in col_idx:
+                    col_idx[k] = len(col_idx)
+        arr = np.full((len(rows), len(col_idx)), np.nan)
+        for i, items in enumerate(rows):
+            for k, v in items.items():
+                if v is not None:
+                    arr[i, col_idx[k]] = v
+
+        df = pd.DataFrame(arr, columns=list(col_idx))
+        # the dates repeat across the statements, parse the unique
+        # ones with the fixed format
+        df.insert(
+            0,
+            self._colname_date,
+            pd.to_datetime(dates, format="%Y-%m-%d", cache=True),
+        )
 
-        return pd.concat(result_list)
+        return df
 
     @staticmethod
     def _validate_input_frequency(obj):
@@ -418,9 +684,9 @@ class FinancialStatementData:
         elif obj in ("annual", "quarterly"):
             return obj
         else:
-            return ValueError(
+            raise ValueError(
                 "The input string has to be either \
-                    'quarterly or 'annual'."
+                    'quarterly' or 'annual'."
             )
 
     def get_balance_sheet(self):
@@ -432,6 +698,8 @@ class FinancialStatementData:
         pd.DataFrame
             A dataframe that contains the balance sheet data.
         """
+        if self._balance is None:
+            self._balance = self._pull_statement("balance")
         return self._balance
 
     def get_income_statement(self):
@@ -443,6 +711,8 @@ class FinancialStatementData:
         pd.DataFrame
             A dataframe that contains the income statement data.
         """
+        if self._income is None:
+            self._income = self._pull_statement("income")
         return self._income
 
     def get_cash_statement(self):
@@ -456,6 +726,8 @@ class FinancialStatementData:
             A dataframe that contains the cash flow statement
             data.
         """
+        if self._cash is None:
+            self._cash = self._pull_statement("cash")
         return self._cash
 
     def get_all_data(self):
@@ -470,6 +742,11 @@ class FinancialStatementData:
             A dataframe that contains all the financial statement
             data.
         """
+        if self._df_merge is None:
+            # the statements already pulled by this object are reused,
+            # and the memoized frame is copied so that no edit of the
+            # returned one reaches it
+            self._df_merge = _get_merged(self.ticker, self.frequency, self).copy()
         return self._df_merge
 
 
@@ -496,6 +773,10 @@ class StockData:
         The frequency of the stock data, it can only
         be 'daily', 'weekly', 'monthly' or None.
         By default None. If None, it will be 'daily'.
+    check_ticker : Union[CheckTicker, None], optional
+        An already validated CheckTicker of the same ticker. If it
+        has stock data, it's reused instead of validating the
+        ticker again. By default None.
 
     Examples
     --------
@@ -538,17 +819,16 @@ class StockData:
         start_date: Union[str, None] = None,
         end_date: Union[str, None] = None,
         frequency: Union[str, None] = None,
+        check_ticker: Union[CheckTicker, None] = None,
     ) -> None:
-        ct = CheckTicker(ticker, type="stock")
-        if ct.has_stock:
-            self.ticker = ct.ticker
+        if _reuse_check_ticker(check_ticker, ticker, "stock"):
+            ct = check_ticker
         else:
-            raise ValueError(
-                f"This ticker {ticker} doesn't have \
-                stock data in sources."
-            )
-
-        self.first_trade_date = ct.get_first_trade_date()
+            # no need to probe, the pull below tells whether the
+            # ticker has stock data
+            ct = CheckTicker(ticker, type="stock", skip_stock_probe=True)
+        self.ticker = ct.ticker
+        self.first_trade_date = None
         self._yf = ct._yf
 
         if frequency is None:
@@ -556,10 +836,10 @@ class StockData:
         else:
             self.frequency = self._validate_frequency(frequency)
 
-        today = datetime.datetime.today()
+        today = datetime.date.today()
 
         if end_date is None:
-            self.end_date = today.strftime("%Y-%m-%d")
+            self.end_date = today.isoformat()
         else:
             self.end_date = _validate_date(end_date)
 
@@ -568,17 +848,33 @@ class StockData:
             # or the first trade date, whichever is later
             three_yrs_ago = today - relativedelta(years=3)
 
-            self.start_date = max(
-                three_yrs_ago.strftime("%Y-%m-%d"), self.first_trade_date
-            )
+            self.start_date = three_yrs_ago.isoformat()
         else:
-            self.start_date = max(_validate_date(start_date), self.first_trade_date)
+            self.start_date = _validate_date(start_date)
 
+        if ct.has_stock:
+            self.first_trade_date = ct.get_first_trade_date()
+            self._clamp_start_date()
+        # check the range before the pull, in both cases
         self._check_date_logic()
 
         self._stock_obj = None
         self._set_obj()
 
+        if not ct.has_stock:
+            ct._set_stock_prices(self._stock_obj)
+            if not ct.has_stock:
+                raise ValueError(
+                    f"This ticker {ticker} doesn't have \
+                    stock data in sources."
+                )
+            # the first trade date is only known after the pull, cut
+            # the pulled data to the clamped window
+            self.first_trade_date = ct.get_first_trade_date()
+            self._clamp_start_date()
+            self._check_date_logic()
+            self._slice_obj()
+
         self._stock = None
         self._dividend = None
         self._split = None
@@ -592,28 +888,61 @@ class StockData:
             self.start_date, self.end_date, self.frequency
         )
 
+    def _slice_obj(self):
+        """
+        Drop the pulled prices and events dated before the start
+        date, so the data covers the same window as start_date.
+        """
+        payload = self._stock_obj.get(self.ticker)
+        if not isinstance(payload, dict):
+            return
+
+        def after_start(rec):
+            return rec.get("formatted_date", self.start_date) >= self.start_date
+
+        sliced = dict(payload)
+        sliced["prices"] = [
+            rec for rec in payload.get("prices") or [] if after_start(rec)
+        ]
+        sliced["eventsData"] = {
+            kind: {key: rec for key, rec in events.items() if after_start(rec)}
+            for kind, events in (payload.get("eventsData") or {}).items()
+        }
+        # a new object, the pulled one may be shared by the caches
+        self._stock_obj = {**self._stock_obj, self.ticker: sliced}
+
     def _pull_stock(self):
         """
         Extract the stock info and format it to pandas dataframe.
         """
         self._stock = pd.DataFrame(self._stock_obj[self.ticker]["prices"])
 
+        # yahoo formats the dates as YYYY-MM-DD, skip the inference
         self._stock[self._colname_date] = pd.to_datetime(
-            self._stock[self._colname_date]
+            self._stock[self._colname_date], format="%Y-%m-%d", cache=True
         )
-        # ToDo: down cast float64 to float32
+        # prices don't need more than float32 precision, and the
+        # volume takes the smallest integer type that holds it
+        float_cols = self._stock.select_dtypes("float64").columns
+        self._stock[float_cols] = self._stock[float_cols].astype(np.float32)
+        if "volume" in self._stock.columns and pd.api.types.is_integer_dtype(
+            self._stock["volume"]
+        ):
+            self._stock["volume"] = pd.to_numeric(
+                self._stock["volume"], downcast="integer"
+            )
 
     def _pull_dividend(self):
         """
         Extract the dividend info and format it to pandas dataframe.
         """
-        self._dividend = pd.DataFrame(
-            self._stock_obj[self.ticker]["eventsData"]["dividends"]
-        ).transpose()
+        # the events are keyed by date, one row per key
+        self._dividend = pd.DataFrame.from_dict(
+            self._stock_obj[self.ticker]["eventsData"]["dividends"], orient="index"
+        ).astype({"amount": np.float32})
         self._dividend[self._colname_date] = pd.to_datetime(
-            self._dividend[self._colname_date]
+            self._dividend[self._colname_date], format="%Y-%m-%d", cache=True
         )
-        self._dividend["amount"] = self._dividend["amount"].astype(np.float32)
 
     def _pull_split(self):
         """
@@ -621,11 +950,17 @@ class StockData:
         dataframe.
         """
         if len(self._stock_obj[self.ticker]["eventsData"]["splits"]) > 0:
-            self._split = pd.DataFrame(
-                self._stock_obj[self.ticker]["eventsData"]["splits"]
-            ).transpose()
+            self._split = pd.DataFrame.from_dict(
+                self._stock_obj[self.ticker]["eventsData"]["splits"], orient="index"
+            )
+            dtypes = {
+                col: np.float32
+                for col in ("numerator", "denominator")
+                if col in self._split.columns
+            }
+            self._split = self._split.astype(dtypes)
             self._split[self._colname_date] = pd.to_datetime(
-                self._split[self._colname_date]
+                self._split[self._colname_date], format="%Y-%m-%d", cache=True
             )
         else:
             warnings.warn(
@@ -654,6 +989,13 @@ class StockData:
         else:
             return obj
 
+    def _clamp_start_date(self):
+        """
+        Move the start date to the first trade date if it's earlier.
+        """
+        start = max(parse_date(self.start_date), parse_date(self.first_trade_date))
+        self.start_date = format_date(start)
+
     def _check_date_logic(self):
         """
         Make sure that the start date is no later than the end date.
@@ -663,7 +1005,7 @@ class StockData:
         ValueError
             If start_date is later than the end_date.
         """
-        if self.end_date < self.start_date:
+        if parse_date(self.end_date) < parse_date(self.start_date):
             raise ValueError(
                 f"Start date (current value \
                 {self.start_date}) must be earlier than end date \
@@ -728,6 +1070,12 @@ class StructuralChange:
     possible_date_list : List[str]
         A list of possible dates that the causal changes should
         be detected on.
+    keep_models : bool, optional
+        Whether to keep the fitted model of every date for the
+        plots. If False, only the periods are kept and the model
+        of a date is fitted again when it's plotted, so the plot
+        comes from a new posterior sample.
+        By default True.
 
     Examples
     --------
@@ -748,7 +1096,7 @@ class StructuralChange:
                 ).sort_index()
     >>> df_stock_fill = df_stock_fill.resample(
             'D'
-            ).fillna('nearest')
+            ).nearest().ffill().bfill()
 
     Specify the list of dates of interest
     >>> change_dt_list = ['2022-02-03','2021-12-09']
@@ -763,15 +1111,23 @@ class StructuralChange:
     >>> sc.plot(change_dt_list[1])
     """
 
-    def __init__(self, df: pd.DataFrame, possible_date_list: List[str]) -> None:
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        possible_date_list: List[str],
+        keep_models: bool = True,
+    ) -> None:
         self._df = _validate_dtype_df(df)
         # ToDo: check df index as datetime
         # ToDo: check date list is list of str
         # ?? Do I want to make sure that df only has one column?
         self.possible_date_list = possible_date_list
+        self.keep_models = keep_models
 
-        self._df_index_min = self._df.index.min().strftime("%Y-%m-%d")
-        self._df_index_max = self._df.index.max().strftime("%Y-%m-%d")
+        self._df_index_min_ts = self._df.index.min()
+        self._df_index_max_ts = self._df.index.max()
+        self._df_index_min = self._df_index_min_ts.strftime("%Y-%m-%d")
+        self._df_index_max = self._df_index_max_ts.strftime("%Y-%m-%d")
 
         self._df_summary = None
 
@@ -794,33 +1150,87 @@ class StructuralChange:
             A pandas dataframe that records the key information
             for the summary.
         """
-        dt_m1 = (
-            datetime.datetime.strptime(dt, "%Y-%m-%d") - datetime.timedelta(days=1)
-        ).strftime("%Y-%m-%d")
-        if self._df_index_min < dt_m1 and self._df_index_max > dt:
-            pre_period = [self._df_index_min, dt_m1]
-            post_period = [dt, self._df_index_max]
-
-            ci = CausalImpact(self._df, pre_period, post_period)
-            self._ci_dict[dt] = ci
-
-            res = ci.summary_data.loc[:, "average"].T
-            res["p-value"] = ci.p_value
-            res["change_date"] = dt
-            return res
+        dt_ts = pd.Timestamp(dt)
+        dt_m1_ts = dt_ts - pd.Timedelta(days=1)
+        if self._df_index_min_ts < dt_m1_ts and self._df_index_max_ts > dt_ts:
+            return self._fit_one_date(dt, dt_m1_ts.strftime("%Y-%m-%d"))
         else:
             return None
 
-    def analyze(self):
+    def _fit_one_date(self, dt: str, dt_m1: str):
+        """
+        Fit the bayesian structural time series model for one date
+        of interest that's known to be in the range of the data.
+
+        Parameters
+        ----------
+        dt : str
+            A string that represents a date of interest.
+            Must be YYYY-MM-DD format.
+        dt_m1 : str
+            The day before the date of interest, in YYYY-MM-DD
+            format.
+
+        Returns
+        -------
+        pd.DataFrame
+            A pandas dataframe that records the key information
+            for the summary.
+        """
+        res, self._ci_dict[dt] = _fit_structural_change(
+            self._df, dt, dt_m1, self.keep_models
+        )
+        return res
+
+    def analyze(self, max_workers: int = 1):
         """
         Main function to iterate all dates from the list
         and generate a summary dataframe.
+
+        Parameters
+        ----------
+        max_workers : int, optional
+            The number of dates fitted at the same time, in
+            separate processes. The fitted models can't be sent
+            back from the workers, so only the periods are kept
+            and a date's model is fitted again when it's plotted,
+            as with keep_models False.
+            By default 1, since tensorflow already uses several
+            cores for one fit.
         """
-        res_list = []
-        for dt in self.possible_date_list:
-            res = self._analyze_one_date(dt)
-            if res is not None:
+        # drop the dates out of the range of the stock data at once,
+        # so that only the dates to be fitted are dispatched
+        dates = pd.to_datetime(self.possible_date_list)
+        dates_m1 = dates - pd.Timedelta(days=1)
+        mask = (dates_m1 > self._df_index_min_ts) & (dates < self._df_index_max_ts)
+        valid_dates = [dt for dt, keep in zip(self.possible_date_list, mask) if keep]
+        valid_dates_m1 = dates_m1[mask].strftime("%Y-%m-%d").tolist()
+
+        if max_workers > 1:
+            # spawn so that the workers don't inherit tensorflow state
+            # from a fork, like cach_data does
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                fits = list(
+                    executor.map(
+                        _fit_structural_change,
+                        repeat(self._df),
+                        valid_dates,
+                        valid_dates_m1,
+                        repeat(False),
+                    )
+                )
+            res_list = []
+            for dt, (res, periods) in zip(valid_dates, fits):
+                self._ci_dict[dt] = periods
                 res_list.append(res)
+        else:
+            res_list = [
+                self._fit_one_date(dt, dt_m1)
+                for dt, dt_m1 in zip(valid_dates, valid_dates_m1)
+            ]
 
         self._df_summary = pd.concat(res_list, axis=1).T.set_index("change_date")
 
@@ -837,7 +1247,12 @@ class StructuralChange:
             Indicate whether to show the plot or not.
             By default True and it will call plt.show()
         """
-        self._ci_dict[dt].plot(show=show)
+        ci = self._ci_dict[dt]
+        if isinstance(ci, tuple):
+            from causalimpact import CausalImpact
+
+            ci = CausalImpact(self._df, *ci)
+        ci.plot(show=show)
 
     def summary(self):
         """
@@ -859,6 +1274,47 @@ class StructuralChange:
             return self._df_summary
 
 
+def _fit_structural_change(df: pd.DataFrame, dt: str, dt_m1: str, keep_model: bool):
+    """
+    Fit the bayesian structural time series model for one date of
+    interest, see StructuralChange. It's a module level function so
+    it can run in a worker process.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The resampled stock time series, indexed by datetime.
+    dt : str
+        A string that represents a date of interest, in
+        YYYY-MM-DD format.
+    dt_m1 : str
+        The day before the date of interest, in YYYY-MM-DD format.
+    keep_model : bool
+        Whether to return the fitted model, or only its periods.
+
+    Returns
+    -------
+    tuple
+        The summary info of the date, and the fitted model or the
+        (pre_period, post_period) tuple.
+    """
+    pre_period = [df.index.min().strftime("%Y-%m-%d"), dt_m1]
+    post_period = [dt, df.index.max().strftime("%Y-%m-%d")]
+
+    # tensorflow comes with it, only import it when a model is fit
+    from causalimpact import CausalImpact
+
+    ci = CausalImpact(df, pre_period, post_period)
+
+    res = ci.summary_data.loc[:, "average"].T
+    res["p-value"] = ci.p_value
+    res["change_date"] = dt
+    if keep_model:
+        return res, ci
+    # the fitted model holds the whole posterior
+    return res, (pre_period, post_period)
+
+
 class FuzzyMatch:
     """
     Main class to perform fuzzy match to the list of values given
@@ -914,7 +1370,7 @@ class FuzzyMatch:
                 in the input dataframe."
             )
 
-    def match(self, input_text: str, num_result: int = 3):
+    def match(self, input_text: str, num_result: int = 3, score_cutoff: int = 0):
         """Find the top matched results from the dataframe.
 
         Parameters
@@ -924,6 +1380,10 @@ class FuzzyMatch:
         num_result : int, optional
             The number of candidates you want to return.
             By default 3
+        score_cutoff : int, optional
+            The candidates scoring below it are left out, so fewer
+            than num_result rows may be returned.
+            By default 0
 
         Returns
         -------
@@ -931,13 +1391,548 @@ class FuzzyMatch:
             A pandas dataframe that contains the matching score, the top matched
             candidates and its relavent info.
         """
-        res = process.extract(input_text, self.list_choices, limit=num_result)
-        result = pd.DataFrame(res, columns=[self.match_by_col, "Matching Score"])
-
-        result = result.merge(self.df_company, on=self.match_by_col, how="inner")
+        # the choices are normalized once, so neither extract nor the
+        # scorer processes them again on every query
+        query = fuzz_utils.full_process(input_text, force_ascii=True)
+        choices = self._get_processed_choices()
+        exact = self._get_exact_index()
+        # a rounded ratio only reaches 100 for different strings of
+        # 200 characters or more
+        if num_result == 1 and 0 < len(query) < 200 and query in exact:
+            # only an identical processed choice scores 100, and the
+            # first of them wins the ties
+            res = [(query, 100, exact[query])]
+        else:
+            res = process.extractBests(
+                query,
+                choices,
+                processor=None,
+                scorer=partial(fuzz.WRatio, full_process=False),
+                score_cutoff=score_cutoff,
+                limit=num_result,
+            )
+        # the choices are keyed by their row positions, take the rows
+        # directly instead of joining the names back
+        result = self.df_company.iloc[[i for _, _, i in res]].reset_index(drop=True)
+        result.insert(0, "Matching Score", [score for _, score, _ in res])
+        result.insert(0, self.match_by_col, result.pop(self.match_by_col))
 
         return result
 
+    def _get_processed_choices(self):
+        """
+        Get the normalized choices keyed by their positions, they're
+        computed again only when list_choices is replaced.
+
+        Returns
+        -------
+        dict
+            The processed choices keyed by their index in
+            list_choices.
+        """
+        cached = getattr(self, "_processed_choices", None)
+        if cached is None or cached[0] is not self.list_choices:
+            processed = {
+                i: fuzz_utils.full_process(choice, force_ascii=True)
+                for i, choice in enumerate(self.list_choices)
+            }
+            cached = (self.list_choices, processed)
+            self._processed_choices = cached
+        return cached[1]
+
+    def _get_exact_index(self):
+        """
+        Get the position of every processed choice, it's built again
+        only when the processed choices are.
+
+        Returns
+        -------
+        dict
+            The first position in list_choices of each processed
+            choice.
+        """
+        processed = self._get_processed_choices()
+        cached = getattr(self, "_exact_index", None)
+        if cached is None or cached[0] is not processed:
+            exact = {}
+            for i, choice in processed.items():
+                exact.setdefault(choice, i)
+            cached = (processed, exact)
+            self._exact_index = cached
+        return cached[1]
+
+
+class FileCache:
+    """
+    A class to keep json objects on disk for a given time to live,
+    so that the responses from the sources survive restarts.
+
+    Parameters
+    ----------
+    folder : Union[str, None], optional
+        The folder where the json files are saved.
+        By default None, if None, it will be
+        ~/.swiftgrasp/cache.
+    max_age : float, optional
+        The age in seconds after which a file is removed by prune,
+        it should be the longest ttl the files are read with.
+        By default 30 days.
+
+    Examples
+    --------
+    >>> fc = FileCache()
+    >>> fc.put('AAPL_prices_0123', {'AAPL': {}})
+
+    Get the object back if it was saved within a day:
+
+    >>> fc.get('AAPL_prices_0123', ttl=86400)
+    {'AAPL': {}}
+    """
+
+    def __init__(
+        self, folder: Union[str, None] = None, max_age: float = 30 * 86400
+    ) -> None:
+        if folder is None:
+            folder = os.path.join(os.path.expanduser("~"), ".swiftgrasp", "cache")
+        self.folder = folder
+        self.max_age = max_age
+        self._pruned = False
+
+    def _path(self, key: str):
+        return os.path.join(self.folder, f"{key}.json")
+
+    def get(self, key: str, ttl: float):
+        """
+        Load the object saved under the key.
+
+        Parameters
+        ----------
+        key : str
+            The name the object was saved under.
+        ttl : float
+            The time to live of the object in seconds.
+
+        Returns
+        -------
+        Any or None
+            The saved object, or None if it doesn't exist, is
+            older than the ttl or can't be read.
+        """
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > ttl:
+                return None
+            with open(path, "rb") as f:
+                return _json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value):
+        """
+        Save the object under the key. The cache is best effort,
+        an object that can't be saved is skipped.
+
+        Parameters
+        ----------
+        key : str
+            The name to save the object under.
+        value : Any
+            A json serializable object.
+        """
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(_json_dumps(value))
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        # the folder is cleaned up once per process, on the first save
+        if not self._pruned:
+            self._pruned = True
+            self.prune()
+
+    def prune(self):
+        """
+        Remove the files older than max_age, which have expired for
+        any ttl, and the partial writes older than an hour.
+        """
+        try:
+            names = os.listdir(self.folder)
+        except OSError:
+            return
+        now = time.time()
+        for name in names:
+            path = os.path.join(self.folder, name)
+            max_age = 3600 if name.endswith(".part") else self.max_age
+            try:
+                if now - os.path.getmtime(path) > max_age:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+class CachedYF:
+    """
+    A wrapper of YahooFinancials that looks up the file cache
+    before sending the requests.
+
+    Closed historical windows and annual statements are kept for
+    30 days; windows ending today and quarterly statements for a
+    day.
+
+    Parameters
+    ----------
+    ticker : str
+        A string that represents the ticker of the company.
+
+    Examples
+    --------
+    >>> yf = CachedYF('AAPL')
+    >>> jsn = yf.get_financial_stmts('quarterly', 'income')
+    >>> prices = yf.get_historical_price_data(
+            '2022-01-03', '2022-06-30', 'daily'
+            )
+    """
+
+    __ttl_short__ = 86400
+    __ttl_long__ = 30 * 86400
+
+    def __init__(self, ticker: str) -> None:
+        self.ticker = ticker
+        self._yf = None
+
+    def _get_yf(self):
+        if self._yf is None:
+            self._yf = YahooFinancials(self.ticker)
+        return self._yf
+
+    def _cached(self, endpoint: str, params: tuple, ttl: float, pull, is_valid):
+        # the ticker is user input, only its safe characters go into the
+        # file name and the full ticker into the digest
+        digest = hashlib.md5(repr((self.ticker, params)).encode()).hexdigest()
+        safe = re.sub(r"[^A-Za-z0-9.^=-]", "", self.ticker).lstrip(".")
+        key = f"{safe}_{endpoint}_{digest}"
+        res = _file_cache.get(key, ttl)
+        if res is None:
+            res = pull()
+            # a failed pull is retried next time rather than kept
+            if is_valid(res):
+                _file_cache.put(key, res)
+        return res
+
+    def _has_statements(self, res: dict):
+        ticker = self.ticker.upper()
+        return len(res) > 0 and all(
+            isinstance(stmt, dict) and bool(stmt.get(ticker)) for stmt in res.values()
+        )
+
+    def _has_prices(self, res: dict):
+        payload = res.get(self.ticker.upper())
+        return isinstance(payload, dict) and bool(payload.get("prices"))
+
+    def get_financial_stmts(self, frequency: str, statement_type):
+        """
+        Pull the financial statement json object, see
+        YahooFinancials.get_financial_stmts.
+        """
+        if frequency.lower() == "annual":
+            ttl = self.__ttl_long__
+        else:
+            ttl = self.__ttl_short__
+        return self._cached(
+            "stmts",
+            (frequency.lower(), statement_type),
+            ttl,
+            lambda: self._get_yf().get_financial_stmts(
+                frequency=frequency, statement_type=statement_type
+            ),
+            self._has_statements,
+        )
+
+    def get_historical_price_data(
+        self, start_date: str, end_date: str, time_interval: str
+    ):
+        """
+        Pull the historical price json object, see
+        YahooFinancials.get_historical_price_data.
+        """
+        if end_date < datetime.date.today().isoformat():
+            ttl = self.__ttl_long__
+        else:
+            ttl = self.__ttl_short__
+        return self._cached(
+            "prices",
+            (start_date, end_date, time_interval),
+            ttl,
+            lambda: self._get_yf().get_historical_price_data(
+                start_date, end_date, time_interval
+            ),
+            self._has_prices,
+        )
+
+
+# the multi-year price responses are large, decode them with orjson
+# when it's installed
+if orjson is not None:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        return json.dumps(obj).encode()
+
+
+_file_cache = FileCache()
+
+
+def _memoize_daily(maxsize: int, is_valid, ignore: tuple = ()):
+    """
+    Memoize a function in the process for the day, like lru_cache
+    but with the date in the key.
+
+    The results that fail is_valid aren't kept, and a kept one that
+    fails it later is dropped on the next call, so a failed pull is
+    retried rather than served until the process restarts.
+
+    Parameters
+    ----------
+    maxsize : int
+        The most results kept, the least recently used go first.
+    is_valid : callable
+        Called with the result and the arguments of the call, with
+        the defaults filled in, returns True if the result can be
+        kept.
+    ignore : tuple, optional
+        The names of the arguments left out of the key, for the
+        ones that only help to compute the result. By default ().
+    """
+
+    def decorator(func):
+        cache = OrderedDict()
+        lock = threading.Lock()
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # bind the call, so the keyword and the default arguments
+            # share the key of the same positional call
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            args, kwargs = bound.args, bound.kwargs
+            key = (
+                datetime.date.today(),
+                tuple(
+                    (name, value)
+                    for name, value in bound.arguments.items()
+                    if name not in ignore
+                ),
+            )
+            with lock:
+                if key in cache:
+                    res = cache[key]
+                    if is_valid(res, *args, **kwargs):
+                        cache.move_to_end(key)
+                        return res
+                    del cache[key]
+            res = func(*args, **kwargs)
+            if is_valid(res, *args, **kwargs):
+                with lock:
+                    cache[key] = res
+                    while len(cache) > maxsize:
+                        cache.popitem(last=False)
+            return res
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+@_memoize_daily(
+    maxsize=256,
+    is_valid=lambda res, ticker, *_: CachedYF(ticker)._has_statements(res),
+)
+def _get_financial_stmts(
+    ticker: str, frequency: str, statement_type: Union[str, tuple]
+):
+    """
+    Pull the financial statement json object from YahooFinancials.
+
+    The responses are memoized for the day, so checking or pulling
+    the same ticker again doesn't hit the source. A failed pull
+    isn't memoized. The returned object is shared and shouldn't be
+    modified.
+
+    Parameters
+    ----------
+    ticker : str
+        A string that represents the ticker of the company.
+    frequency : str
+        Either 'quarterly' or 'annual'.
+    statement_type : Union[str, tuple]
+        One of 'balance', 'income' or 'cash', or a tuple of them
+        to pull several statements in one call.
+
+    Returns
+    -------
+    dict
+        The raw json object of the financial statement data.
+    """
+    if isinstance(statement_type, tuple):
+        statement_type = list(statement_type)
+    return CachedYF(ticker).get_financial_stmts(
+        frequency=frequency, statement_type=statement_type
+    )
+
+
+@_memoize_daily(maxsize=256, is_valid=lambda res, *_: not res.empty, ignore=("fsd",))
+def _get_merged(ticker: str, frequency: str, fsd=None):
+    """
+    Pull and merge all the financial statement data of the ticker.
+
+    The merged dataframes are memoized for the day, so a ticker is
+    only merged once a day in a process. An empty merge isn't
+    memoized. The returned dataframe is shared and shouldn't be
+    modified.
+
+    Parameters
+    ----------
+    ticker : str
+        A string that represents the ticker of the company.
+    frequency : str
+        Either 'quarterly' or 'annual'.
+    fsd : Union[FinancialStatementData, None], optional
+        The validated FinancialStatementData of the ticker, its
+        statements are reused for the merge. It's not part of the
+        key. If None, a new one is created. By default None.
+
+    Returns
+    -------
+    pd.DataFrame
+        A dataframe that contains all the financial statement data.
+    """
+    if fsd is None:
+        fsd = FinancialStatementData(ticker, frequency)
+    fsd._pull_data()
+    fsd._merge_data()
+    return fsd._df_merge
+
+
+@_memoize_daily(
+    maxsize=256,
+    is_valid=lambda res, ticker, *_: CachedYF(ticker)._has_prices(res),
+)
+def _probe_stock_prices(ticker: str, end_date: str):
+    """
+    Pull the weekly prices of the 8 days until the end date, to
+    check whether the ticker has stock price data.
+
+    The responses are memoized for the day, so the same ticker is
+    only probed once a day in a process. A probe that found no
+    prices isn't memoized. The returned object is shared and
+    shouldn't be modified.
+
+    Parameters
+    ----------
+    ticker : str
+        A string that represents the ticker of the company.
+    end_date : str
+        The end date of the window, in YYYY-MM-DD format.
+
+    Returns
+    -------
+    dict
+        The raw json object of the historical price data.
+    """
+    days_ago = parse_date(end_date) - relativedelta(days=8)
+    return CachedYF(ticker).get_historical_price_data(
+        days_ago.strftime("%Y-%m-%d"), end_date, "weekly"
+    )
+
+
+def _reuse_check_ticker(ct, ticker: str, type: str):
+    """
+    Check whether the given CheckTicker can stand in for a new
+    validation of the ticker.
+
+    Parameters
+    ----------
+    ct : Union[CheckTicker, None]
+        The CheckTicker to be reused.
+    ticker : str
+        The ticker to be validated.
+    type : str
+        Either 'statement' or 'stock'.
+
+    Returns
+    -------
+    bool
+        True if it's a CheckTicker of the same ticker that already
+        found the data of the type.
+    """
+    if not isinstance(ct, CheckTicker) or not isinstance(ticker, str):
+        return False
+    if ct.ticker != ticker.upper():
+        return False
+    if type == "statement":
+        return ct.has_statement
+    else:
+        return ct.has_stock
+
+
+def _check_ticker_not_failed(ct, *args):
+    """
+    Check whether none of the checks that the CheckTicker ran so
+    far has failed, the unchecked ones don't count.
+
+    Parameters
+    ----------
+    ct : CheckTicker
+        The CheckTicker to be looked at.
+
+    Returns
+    -------
+    bool
+        False if has_statement or has_stock was read and is False.
+    """
+    return all(vars(ct).get(name, True) for name in ("has_statement", "has_stock"))
+
+
+@_memoize_daily(maxsize=1024, is_valid=_check_ticker_not_failed)
+def _get_check_ticker(ticker: str, frequency: str = "quarterly"):
+    """
+    Get the CheckTicker of the ticker, shared in the process so the
+    same ticker is only checked once.
+
+    It's created with type 'both': the checks are only run when
+    they're first read, so it serves the statement and the stock
+    checks alike, and one that ran already isn't run again.
+
+    It's shared for the day, and dropped once one of its checks has
+    failed so the ticker is checked again on the next call. The
+    returned object is shared and shouldn't be modified.
+
+    Parameters
+    ----------
+    ticker : str
+        A string that represents the ticker of the company, in
+        upper case.
+    frequency : str, optional
+        The frequency of the statement probe, see CheckTicker.
+        By default 'quarterly'.
+
+    Returns
+    -------
+    CheckTicker
+        The CheckTicker of the ticker.
+    """
+    return CheckTicker(ticker, type="both", frequency=frequency)
+
 
 def _validate_dtype_df(obj):
     """
@@ -986,10 +1981,51 @@ def _validate_date(obj):
     """
     obj = _validate_type_str(obj)
     try:
-        _ = datetime.datetime.strptime(obj, "%Y-%m-%d")
+        # parse it through the memoized parser, the date is parsed
+        # again when it's compared
+        _ = parse_date(obj)
         return obj
     except:  # noqa: E722
         raise ValueError(
             "Input {obj} value format must be \
             YYYY-MM-DD."
         )
+
+
+@lru_cache(maxsize=256)
+def parse_date(obj: str):
+    """
+    Parse a string in YYYY-MM-DD format to a date.
+
+    The results are memoized since the same few dates are parsed
+    on every rerun of the app.
+
+    Parameters
+    ----------
+    obj : str
+        A string that represents a date, in YYYY-MM-DD format.
+
+    Returns
+    -------
+    datetime.date
+        The parsed date.
+    """
+    return datetime.date.fromisoformat(obj)
+
+
+@lru_cache(maxsize=256)
+def format_date(obj: datetime.date):
+    """
+    Format a date to a string in YYYY-MM-DD format.
+
+    Parameters
+    ----------
+    obj : datetime.date
+        The date to be formatted.
+
+    Returns
+    -------
+    str
+        The formatted date string.
+    """
+    return obj.strftime("%Y-%m-%d")
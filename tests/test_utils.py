@@ -1,12 +1,21 @@
+import os
+import pickle
+import time
 import pytest
-from unittest.mock import patch
 import pandas as pd
+from thefuzz import process
 from src.SwiftGrasp.utils import (
-    # CheckTicker,
-    # FinancialStatementData,
+    CheckTicker,
+    FinancialStatementData,
     # StockData,
     # StructuralChange,
     FuzzyMatch,
+    FileCache,
+    CachedYF,
+    StockData,
+    _memoize_daily,
+    _get_check_ticker,
+    _get_merged,
 )
 
 
@@ -24,17 +33,32 @@ def input_df_comany():
     )
 
 
-def mock_FuzzyMatch_init(self):
-    self.df_company = None
-    self.match_by_col = None
-    self.list_choices = None
+@pytest.fixture(scope="module")
+def company_df():
+    return input_df_comany()
+
+
+class _ResourceUnpickler(pickle.Unpickler):
+    # the app pickles from the top-level utils module
+    def find_class(self, module, name):
+        if module == "utils":
+            module = FuzzyMatch.__module__
+        return super().find_class(module, name)
+
+
+@pytest.fixture(scope="module")
+def shipped_fuzzy_match():
+    path = os.path.join(
+        os.path.dirname(__file__), "..", "src", "SwiftGrasp", "resources"
+    )
+    with open(os.path.join(path, "fuzzy_match.p"), "rb") as f:
+        return _ResourceUnpickler(f).load()
 
 
 class TestFuzzyMatch:
 
     input_output_combinations1 = [
         (
-            input_df_comany(),
             [
                 "American Airlines Group, Inc.",
                 "Apple Inc.",
@@ -50,7 +74,6 @@ class TestFuzzyMatch:
             ),
         ),
         (
-            input_df_comany(),
             [
                 "American Airlines Group, Inc.",
                 "Apple Inc.",
@@ -71,24 +94,22 @@ class TestFuzzyMatch:
     ]
 
     @pytest.mark.parametrize(
-        "df,list_choices,match_by_col,input_text,num_results,expected_df,",
+        "list_choices,match_by_col,input_text,num_results,expected_df,",
         input_output_combinations1,
-    )
-    @patch(
-        "src.SwiftGrasp.utils.FuzzyMatch.__init__",
-        mock_FuzzyMatch_init,
+        ids=["apple-top1", "airline-top2"],
     )
     def test_match(
         self,
-        df,
+        company_df,
         list_choices,
         match_by_col,
         input_text,
         num_results,
         expected_df,
     ):
-        fm = FuzzyMatch()
-        fm.df_company = df
+        # skip __init__, the attributes are set directly
+        fm = FuzzyMatch.__new__(FuzzyMatch)
+        fm.df_company = company_df
         fm.list_choices = list_choices
         fm.match_by_col = match_by_col
         df_res = fm.match(input_text, num_results)
@@ -96,7 +117,6 @@ class TestFuzzyMatch:
 
     input_output_combinations2 = [
         (
-            input_df_comany(),
             "Company Name",
             [
                 "American Airlines Group, Inc.",
@@ -106,46 +126,384 @@ class TestFuzzyMatch:
             ],
         ),
         (
-            input_df_comany(),
             "Ticker",
             ["AAL", "AAPL", "AMZN", "GOOGL"],
         ),
     ]
 
     @pytest.mark.parametrize(
-        "df,match_by_col,expected_list_choices,",
+        "match_by_col,expected_list_choices,",
         input_output_combinations2,
     )
     def test_FuzzyMatch_init(
         self,
-        df,
+        company_df,
         match_by_col,
         expected_list_choices,
     ):
-        fm = FuzzyMatch(df, match_by_col)
+        fm = FuzzyMatch(company_df, match_by_col)
         # ? should maintain the order
         # If not expected then should check equality via Set?
         assert fm.list_choices == expected_list_choices
 
     input_output_combinations3 = [
         (
-            input_df_comany(),
             "foobar",
             "does not exist",
         ),
     ]
 
     @pytest.mark.parametrize(
-        "df,match_by_col,expected_info,",
+        "match_by_col,expected_info,",
         input_output_combinations3,
     )
     def test_FuzzyMatch_init_exception(
         self,
-        df,
+        company_df,
         match_by_col,
         expected_info,
     ):
         with pytest.raises(ValueError) as excinfo:
-            FuzzyMatch(df, match_by_col)
+            FuzzyMatch(company_df, match_by_col)
+
+        assert expected_info in str(excinfo.value)
+
+    def test_match_score_cutoff(self, company_df):
+        fm = FuzzyMatch(company_df)
+        df_res = fm.match("apple", 4, score_cutoff=60)
+        expected_df = pd.DataFrame(
+            [["Apple Inc.", 90, "AAPL"]],
+            columns=["Company Name", "Matching Score", "Ticker"],
+        )
+        pd.testing.assert_frame_equal(df_res, expected_df)
+
+    @pytest.mark.parametrize(
+        "input_text,num_results,",
+        [
+            ("aple", 3),
+            ("mcdonlds", 3),
+            ("facebok", 3),
+            ("goggle", 3),
+            ("Apple Inc.", 1),
+        ],
+    )
+    def test_match_same_as_full_scan(
+        self, shipped_fuzzy_match, input_text, num_results
+    ):
+        fm = shipped_fuzzy_match
+        df_res = fm.match(input_text, num_results)
+        res = list(zip(df_res[fm.match_by_col], df_res["Matching Score"]))
+        # the plain thefuzz scan over the raw choices is the reference
+        expected = process.extract(input_text, fm.list_choices, limit=num_results)
+        assert res == expected
+
+    def test_match_exact(self, company_df):
+        fm = FuzzyMatch(company_df)
+        df_res = fm.match("apple inc.", 1)
+        expected_df = pd.DataFrame(
+            [["Apple Inc.", 100, "AAPL"]],
+            columns=["Company Name", "Matching Score", "Ticker"],
+        )
+        pd.testing.assert_frame_equal(df_res, expected_df)
+
+
+class TestFinancialStatementData:
+
+    input_output_combinations1 = [
+        (None, "quarterly"),
+        ("quarterly", "quarterly"),
+        ("annual", "annual"),
+    ]
+
+    @pytest.mark.parametrize(
+        "frequency,expected_frequency,",
+        input_output_combinations1,
+    )
+    def test_validate_input_frequency(self, frequency, expected_frequency):
+        res = FinancialStatementData._validate_input_frequency(frequency)
+        assert res == expected_frequency
+
+    input_output_combinations2 = [
+        ("monthly", ValueError, "'quarterly' or 'annual'"),
+        (1, TypeError, "None or String type"),
+    ]
+
+    @pytest.mark.parametrize(
+        "frequency,expected_exception,expected_info,",
+        input_output_combinations2,
+    )
+    def test_validate_input_frequency_exception(
+        self,
+        frequency,
+        expected_exception,
+        expected_info,
+    ):
+        with pytest.raises(expected_exception) as excinfo:
+            FinancialStatementData._validate_input_frequency(frequency)
 
         assert expected_info in str(excinfo.value)
+
+    def test_merge_data_newest_first(self):
+        fsd = FinancialStatementData.__new__(FinancialStatementData)
+        fsd.ticker = "AAPL"
+        fsd.frequency = "quarterly"
+        fsd._colname_date = "formatted_date"
+        suffix = fsd._get_table_suffix()
+        fsd._header_map = {
+            abbr: prefix + "History" + suffix
+            for abbr, prefix in fsd.__table_prefix_dict__.items()
+        }
+        for abbr, item in [("balance", "a"), ("income", "b"), ("cash", "c")]:
+            jsn = {
+                fsd._header_map[abbr]: {
+                    "AAPL": [{"2022-03-31": {item: 2}}, {"2021-12-31": {item: 1}}]
+                }
+            }
+            setattr(fsd, "_" + abbr, fsd._format_financial_data(jsn, abbr))
+        fsd._merge_data()
+
+        assert list(fsd._df_merge["formatted_date"].astype(str)) == [
+            "2022-03-31",
+            "2021-12-31",
+        ]
+
+    def test_get_all_data_is_a_copy(self, monkeypatch):
+        calls = []
+
+        def get_financial_stmts(ticker, frequency, abbr):
+            calls.append(abbr)
+            header = FinancialStatementData.__table_prefix_dict__[abbr]
+            rows = [{"2022-03-31": {abbr: 2}}, {"2021-12-31": {abbr: 1}}]
+            return {header + "HistoryQuarterly": {ticker: rows}}
+
+        monkeypatch.setattr(
+            "src.SwiftGrasp.utils._get_financial_stmts", get_financial_stmts
+        )
+        ct = CheckTicker("AAPL")
+        ct.has_statement = True
+        try:
+            df = FinancialStatementData("AAPL", check_ticker=ct).get_all_data()
+            df.loc[0, "income"] = 100
+            df2 = FinancialStatementData("AAPL", check_ticker=ct).get_all_data()
+        finally:
+            _get_merged.cache_clear()
+
+        assert list(df2["income"]) == [2, 1]
+        # the statements are pulled once, by the first object
+        assert sorted(calls) == ["balance", "cash", "income"]
+
+
+class TestStockData:
+    prices = {
+        "AAPL": {
+            "firstTradeDate": {"formatted_date": "2021-01-04"},
+            "prices": [
+                {"formatted_date": "2020-12-31", "close": 1.0},
+                {"formatted_date": "2021-01-04", "close": 2.0},
+            ],
+            "eventsData": {
+                "dividends": {
+                    "2020-12-31": {"formatted_date": "2020-12-31", "amount": 0.1},
+                    "2021-01-05": {"formatted_date": "2021-01-05", "amount": 0.2},
+                },
+                "splits": {},
+            },
+        }
+    }
+
+    def test_start_date_before_first_trade_date(self, monkeypatch):
+        pulls = []
+
+        def get_historical_price_data(yf, start_date, end_date, time_interval):
+            pulls.append(start_date)
+            return self.prices
+
+        monkeypatch.setattr(
+            CachedYF, "get_historical_price_data", get_historical_price_data
+        )
+        sd = StockData("AAPL", start_date="2020-06-01", end_date="2021-02-01")
+
+        assert pulls == ["2020-06-01"]
+        assert sd.start_date == "2021-01-04"
+        assert list(sd.get_stock()["close"]) == [2.0]
+        assert list(sd.get_dividend()["amount"]) == pytest.approx([0.2])
+
+    def test_date_logic_checked_before_pull(self, monkeypatch):
+        pulls = []
+        monkeypatch.setattr(
+            CachedYF,
+            "get_historical_price_data",
+            lambda yf, *args: pulls.append(args),
+        )
+        with pytest.raises(ValueError) as excinfo:
+            StockData("AAPL", start_date="2021-02-01", end_date="2021-01-01")
+
+        assert "must be earlier than end date" in str(excinfo.value)
+        assert pulls == []
+
+
+class TestFileCache:
+    def test_put_get(self, tmp_path):
+        fc = FileCache(str(tmp_path))
+        obj = {"AAPL": {"prices": [{"close": 1.5}]}}
+        fc.put("AAPL_prices_0", obj)
+
+        assert fc.get("AAPL_prices_0", ttl=60) == obj
+
+    def test_get_missing_or_expired(self, tmp_path):
+        fc = FileCache(str(tmp_path))
+        fc.put("AAPL_prices_0", {"AAPL": None})
+
+        assert fc.get("AAPL_prices_1", ttl=60) is None
+        assert fc.get("AAPL_prices_0", ttl=-1) is None
+
+    def test_prune(self, tmp_path):
+        fc = FileCache(str(tmp_path), max_age=60)
+        fc.put("AAPL_prices_0", {"AAPL": None})
+        fc.put("AAPL_prices_1", {"AAPL": None})
+        old = time.time() - 120
+        os.utime(os.path.join(str(tmp_path), "AAPL_prices_0.json"), (old, old))
+        fc.prune()
+
+        assert os.listdir(str(tmp_path)) == ["AAPL_prices_1.json"]
+
+
+class TestCachedYF:
+    def test_failed_pull_is_not_saved(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(
+            "src.SwiftGrasp.utils._file_cache", FileCache(str(tmp_path))
+        )
+        yf = CachedYF("AAPL")
+        res = yf._cached(
+            "stmts",
+            ("quarterly", "income"),
+            60,
+            lambda: {"h": {"AAPL": None}},
+            yf._has_statements,
+        )
+
+        assert res == {"h": {"AAPL": None}}
+        assert os.listdir(str(tmp_path)) == []
+
+    def test_ticker_stays_in_cache_folder(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(
+            "src.SwiftGrasp.utils._file_cache", FileCache(str(tmp_path))
+        )
+        yf = CachedYF("../../AAPL")
+        jsn = {"../../AAPL": {"prices": [{"close": 1.5}]}}
+        yf._cached("prices", ("a", "b", "daily"), 60, lambda: jsn, yf._has_prices)
+
+        names = os.listdir(str(tmp_path))
+        assert len(names) == 1
+        assert names[0].startswith("AAPL_prices_")
+
+
+class TestMemoizeDaily:
+    def test_failed_result_is_retried(self):
+        calls = []
+
+        @_memoize_daily(maxsize=2, is_valid=lambda res, *_: res is not None)
+        def pull(ticker):
+            calls.append(ticker)
+            return None if ticker == "FOO" else ticker
+
+        assert pull("AAPL") == "AAPL"
+        assert pull("AAPL") == "AAPL"
+        assert pull("FOO") is None
+        assert pull("FOO") is None
+        assert calls == ["AAPL", "FOO", "FOO"]
+
+    def test_keyword_and_default_arguments(self):
+        calls = []
+
+        @_memoize_daily(maxsize=4, is_valid=lambda res, *_: True)
+        def pull(ticker, frequency="quarterly"):
+            calls.append((ticker, frequency))
+            return ticker
+
+        pull("AAPL")
+        pull("AAPL", "quarterly")
+        pull(ticker="AAPL", frequency="quarterly")
+        pull("AAPL", frequency="annual")
+        assert calls == [("AAPL", "quarterly"), ("AAPL", "annual")]
+
+    def test_maxsize(self):
+        calls = []
+
+        @_memoize_daily(maxsize=1, is_valid=lambda res, *_: True)
+        def pull(ticker):
+            calls.append(ticker)
+            return ticker
+
+        pull("AAPL")
+        pull("MSFT")
+        pull("AAPL")
+        assert calls == ["AAPL", "MSFT", "AAPL"]
+
+
+@pytest.fixture
+def clear_check_ticker():
+    yield
+    # the shared CheckTickers are memoized for the process
+    _get_check_ticker.cache_clear()
+
+
+class TestCheckTicker:
+    def test_CheckTicker_init_is_lazy(self):
+        # nothing is pulled until the checks are read, and the
+        # types not asked for stay unchecked
+        ct = CheckTicker("aapl", type="statement")
+        assert ct.ticker == "AAPL"
+        assert ct.has_stock is False
+
+    @pytest.mark.usefixtures("clear_check_ticker")
+    def test_get_check_ticker_drops_failed_checks(self):
+        ct = _get_check_ticker("FOOBAR")
+        ct.has_statement = True
+        assert _get_check_ticker("FOOBAR") is ct
+
+        ct.has_statement = False
+        assert _get_check_ticker("FOOBAR") is not ct
+
+    @pytest.mark.usefixtures("clear_check_ticker")
+    def test_CheckTicker_validate_many(self, monkeypatch):
+        stmts = {
+            "AAPL": {"incomeStatementHistoryQuarterly": {"AAPL": [{}]}},
+            "FOO": {"incomeStatementHistoryQuarterly": {"FOO": None}},
+            "BAR": None,
+        }
+        prices = {
+            "AAPL": {"AAPL": {"eventsData": {}, "prices": [{"close": 1.5}]}},
+            "FOO": {"FOO": None},
+            "BAR": None,
+        }
+        monkeypatch.setattr(
+            "src.SwiftGrasp.utils._get_financial_stmts",
+            lambda ticker, *_: stmts[ticker],
+        )
+        monkeypatch.setattr(
+            "src.SwiftGrasp.utils._probe_stock_prices",
+            lambda ticker, *_: prices[ticker],
+        )
+        cts = CheckTicker.validate_many(["aapl", "AAPL", "foo", "bar"], "both")
+
+        assert list(cts) == ["AAPL", "FOO", "BAR"]
+        assert [(ct.has_statement, ct.has_stock) for ct in cts.values()] == [
+            (True, True),
+            (False, False),
+            (False, False),
+        ]
+        # they're the shared ones
+        assert _get_check_ticker("AAPL") is cts["AAPL"]
+
+    def test_CheckTicker_init_exception(self):
+        with pytest.raises(ValueError) as excinfo:
+            CheckTicker("AAPL", type="foobar")
+
+        assert "'statement', 'stock' or 'both'" in str(excinfo.value)
+
+    def test_CheckTicker_validate_many_exception(self):
+        with pytest.raises(ValueError) as excinfo:
+            CheckTicker.validate_many(["AAPL", "MSFT"], type="foobar")
+
+        assert "'statement', 'stock' or 'both'" in str(excinfo.value)